@@ -1,31 +1,44 @@
 import logging
+import time
 from datetime import datetime, timedelta
-from typing import Optional
-from uuid import uuid4
+from typing import Optional, Tuple
 
 import jwt
 from fastapi import Response
 from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
 from jwt import ExpiredSignatureError, PyJWTError
-from passlib.context import CryptContext
 
-from app.database.redis import redis_client
+from app.database.redis import RotationResult, redis_client
 from app.schemas.auth import TokenUserModel
+from app.utils.uuid7 import uuid7
 
 from .config import Config
-from .exceptions import ExpiredLink, InvalidLink, InvalidToken, RefreshTokenExpired, TokenExpired
+from .exceptions import (
+    ExpiredLink,
+    InvalidLink,
+    InvalidToken,
+    RefreshTokenExpired,
+    RefreshTokenRequired,
+    RefreshTokenReused,
+    SessionStoreUnavailable,
+    TokenExpired,
+)
+from .hashing import password_context, password_hasher
+from .keys import key_ring
 from .logger import setup_logger
+from .token_cache import token_cache
 
 logger = setup_logger(__name__)
 
 
 class Authentication:
-    password_context = CryptContext(schemes=["bcrypt"])
+    password_context = password_context
     ACCESS_TOKEN_EXPIRY_IN_SECONDS = 900  # 15 mins
     REFRESH_TOKEN_EXPIRY_IN_SECONDS = 604800  # 7 days
 
     ACCOUNT_VERIFY_TOKEN_EXPIRY_IN_SECONDS = 86400  # 24 hours
     PWD_RESET_TOKEN_EXPIRY_IN_SECONDS = 3600  # 1 hour
+    SLIM_USER_CLAIMS = {"uid", "id"}
     serializer: URLSafeTimedSerializer = URLSafeTimedSerializer(secret_key=Config.JWT_SECRET, salt=Config.EMAIL_SALT)
 
     @staticmethod
@@ -36,6 +49,16 @@ class Authentication:
     def verify_password(password: str, hash: str) -> bool:
         return Authentication.password_context.verify(password, hash)
 
+    @staticmethod
+    async def hash_password(password: str) -> str:
+        """Hash a password on the hashing pool without blocking the event loop."""
+        return await password_hasher.hash_password(password)
+
+    @staticmethod
+    async def check_password(password: str, hash: str) -> bool:
+        """Verify a password on the hashing pool without blocking the event loop."""
+        return await password_hasher.verify_password(password, hash)
+
     @staticmethod
     async def create_token(
         user_data: TokenUserModel,
@@ -45,11 +68,21 @@ class Authentication:
     ) -> str:
         payload = {}
 
-        if refresh:
-            payload["user"] = user_data.model_dump(mode="json", include={"uid", "id"})
+        if refresh or Config.ACCESS_TOKEN_CLAIMS_PROFILE == "slim":
+            payload["user"] = user_data.model_dump(mode="json", include=Authentication.SLIM_USER_CLAIMS)
         else:
             payload["user"] = user_data.model_dump(mode="json")
 
+        if not refresh and Config.ACCESS_TOKEN_CLAIMS_PROFILE == "slim" and Config.PROFILE_CACHE_TTL_SECONDS:
+            try:
+                await redis_client.set_profile(
+                    uid=payload["user"]["uid"],
+                    profile=user_data.model_dump_json(),
+                    expiry=Config.PROFILE_CACHE_TTL_SECONDS,
+                )
+            except Exception as e:
+                logger.warning(f"Failed to cache user profile: {e}")
+
         payload["exp"] = int(
             (
                 datetime.now()
@@ -66,49 +99,155 @@ class Authentication:
                 )
             ).timestamp()
         )
-        payload["jti"] = str(uuid4())
-        payload["refresh"] = refresh
-        token = jwt.encode(payload=payload, key=Config.JWT_SECRET, algorithm=Config.JWT_ALGORITHM)
+        token, payload = Authentication._encode_token(payload, refresh=refresh)
 
         if refresh:
+            # A refresh token without its session would look stolen on first use and log the user out
+            # everywhere, so none is issued unless the session is stored.
             try:
-                redis_key = payload["jti"]
-                await redis_client.client.set(
-                    name=redis_key, value=token, ex=Authentication.REFRESH_TOKEN_EXPIRY_IN_SECONDS
+                stored = await redis_client.add_session(
+                    uid=payload["user"]["uid"],
+                    jti=payload["jti"],
+                    token=token,
+                    expiry=Authentication.REFRESH_TOKEN_EXPIRY_IN_SECONDS,
                 )
-
-                if response:
-                    response.set_cookie(
-                        key="refresh_token",
-                        value=redis_key,
-                        httponly=True,
-                        samesite="lax" if Config.ENVIRONMENT == "development" else "none",
-                        secure=Config.ENVIRONMENT != "development",
-                        max_age=Authentication.REFRESH_TOKEN_EXPIRY_IN_SECONDS,
-                        path="/",
-                        domain=None if Config.ENVIRONMENT == "development" else f".{Config.API_DOMAIN}",
-                    )
-
             except Exception as e:
-                logging.error(f"Failed to initialize Redis client: {e}")
-                pass
+                logger.error(f"Failed to store refresh session: {e}")
+                raise SessionStoreUnavailable()
+            if not stored:
+                raise SessionStoreUnavailable()
+
+            if response:
+                Authentication._set_refresh_cookie(response, payload["jti"], token)
 
         return token
 
+    @staticmethod
+    async def get_token_user(token_payload: dict) -> Optional[TokenUserModel]:
+        """Return the full user profile for a decoded access token.
+
+        Full-profile tokens carry it in their claims; slim tokens are looked up in
+        the short-lived profile cache. `None` means the caller must load the user
+        from the database.
+        """
+        user = token_payload["user"]
+        if "email" in user:
+            return TokenUserModel.model_validate(user)
+
+        try:
+            profile = await redis_client.get_profile(user["uid"])
+        except Exception as e:
+            logger.warning(f"Failed to read cached user profile: {e}")
+            return None
+
+        return TokenUserModel.model_validate_json(profile) if profile else None
+
+    @staticmethod
+    def _encode_token(payload: dict, refresh: bool) -> Tuple[str, dict]:
+        payload["jti"] = str(uuid7())
+        payload["refresh"] = refresh
+        key, headers = key_ring.signing_key()
+        token = jwt.encode(payload=payload, key=key, algorithm=Config.JWT_ALGORITHM, headers=headers)
+        return token, payload
+
+    @staticmethod
+    def _set_refresh_cookie(response: Response, jti: str, token: str):
+        # The compact key schema keeps only a fingerprint of the token in Redis and
+        # cluster mode needs the uid to find a session, so there the cookie carries
+        # the token itself instead of its jti.
+        response.set_cookie(
+            key="refresh_token",
+            value=token if redis_client.keys.token_in_cookie else jti,
+            httponly=True,
+            samesite="lax" if Config.ENVIRONMENT == "development" else "none",
+            secure=Config.ENVIRONMENT != "development",
+            max_age=Authentication.REFRESH_TOKEN_EXPIRY_IN_SECONDS,
+            path="/",
+            domain=None if Config.ENVIRONMENT == "development" else f".{Config.API_DOMAIN}",
+        )
+
+    @staticmethod
+    async def resolve_refresh_token(cookie_value: str) -> Optional[str]:
+        """Return the refresh JWT the `refresh_token` cookie stands for."""
+        if redis_client.keys.token_in_cookie:
+            return cookie_value
+        return await redis_client.get_session(cookie_value)
+
+    @staticmethod
+    async def rotate_refresh_token(refresh_token: str, response: Optional[Response] = None) -> str:
+        """Swap a refresh token for a new one in a single atomic Redis call.
+
+        Presenting a refresh token that was already rotated or revoked is treated
+        as token theft: every session of that user is revoked. The exception is a
+        token rotated less than REFRESH_TOKEN_REUSE_GRACE_SECONDS ago, as happens
+        when two tabs refresh at once or a request is retried after its response
+        was lost: that returns the token it was rotated to.
+        """
+        payload = await Authentication.decode_token(refresh_token)
+        if not payload.get("refresh"):
+            raise RefreshTokenRequired()
+
+        new_token, new_payload = Authentication._encode_token(
+            {
+                "user": payload["user"],
+                "exp": int(time.time()) + Authentication.REFRESH_TOKEN_EXPIRY_IN_SECONDS,
+            },
+            refresh=True,
+        )
+
+        try:
+            result, successor = await redis_client.rotate_session(
+                uid=payload["user"]["uid"],
+                old_jti=payload["jti"],
+                old_token=refresh_token,
+                old_expires_at=payload["exp"],
+                new_jti=new_payload["jti"],
+                new_token=new_token,
+                expiry=Authentication.REFRESH_TOKEN_EXPIRY_IN_SECONDS,
+                grace=Config.REFRESH_TOKEN_REUSE_GRACE_SECONDS,
+            )
+        except Exception as e:
+            logger.error(f"Failed to rotate refresh token: {e}")
+            raise InvalidToken()
+
+        if result == RotationResult.SUPERSEDED:
+            new_token = successor
+            new_payload = await Authentication.decode_token(successor)
+        elif result == RotationResult.REUSED:
+            logger.warning(f"Refresh token reuse detected for user {payload['user']['uid']}, revoking all sessions")
+            await redis_client.revoke_all_sessions(payload["user"]["uid"])
+            raise RefreshTokenReused()
+        elif result != RotationResult.ROTATED:
+            raise InvalidToken()
+
+        token_cache.evict_jti(payload["jti"])
+        if response:
+            Authentication._set_refresh_cookie(response, new_payload["jti"], new_token)
+
+        return new_token
+
     @staticmethod
     async def decode_token(token: str):
+        cached_payload = token_cache.get(token)
+        if cached_payload is not None:
+            return cached_payload
+
         try:
             token_payload = jwt.decode(
                 jwt=token,
-                key=Config.JWT_SECRET,
+                key=key_ring.verification_key(token),
                 algorithms=[Config.JWT_ALGORITHM],
                 verify=True,
             )
+            token_cache.set(token, token_payload)
             return token_payload
         except ExpiredSignatureError:
             try:
                 unverified_payload = jwt.decode(
-                    jwt=token, key=Config.JWT_SECRET, algorithms=[Config.JWT_ALGORITHM], options={"verify_exp": False}
+                    jwt=token,
+                    key=key_ring.verification_key(token),
+                    algorithms=[Config.JWT_ALGORITHM],
+                    options={"verify_exp": False},
                 )
                 is_refresh = unverified_payload.get("refresh", False)
                 logging.warning(f"Token expired. Is refresh: {is_refresh}")
@@ -147,17 +286,8 @@ class Authentication:
                 )
             )
 
-            success = await redis_client.client.set(
-                name=redis_name,
-                value=token,
-                ex=ex,
-            )
-            if not success:
-                raise ValueError("Failed to store token in Redis")
-
-            stored_token = await redis_client.client.get(redis_name)
-            if stored_token != token:
-                raise ValueError(f"Token verification failed for {redis_name}")
+            if not await redis_client.store_url_token(name=redis_name, token=token, expiry=ex):
+                raise ValueError(f"Failed to store token in Redis for {redis_name}")
 
             logger.info(f"Successfully stored token in Redis for {redis_name}")
 
@@ -0,0 +1,353 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, get_type_hints
+
+from fastapi import BackgroundTasks, Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database.base import AsyncSessionMaker
+from app.database.redis import redis_client
+from app.database.redis_pool import subscription_messages
+
+from .config import Config
+from .logger import setup_logger
+from .metrics import metrics
+
+logger = setup_logger(__name__)
+
+# Arguments that are per-request plumbing rather than part of what is being cached.
+UNCACHEABLE_ARGUMENTS = (Request, Response, BackgroundTasks, AsyncSession)
+
+
+class CacheEntry:
+    __slots__ = ("value", "fresh_until", "stale_until", "tags")
+
+    def __init__(self, value: Any, fresh_until: float, stale_until: float, tags: Sequence[str]):
+        self.value = value
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+        self.tags = tags
+
+
+class LocalCache:
+    """Per-process LRU of cache entries (L1), indexed by tag for invalidation.
+
+    Entries are kept for at most `ttl` seconds even while still fresh in Redis,
+    which bounds how long a worker that missed an invalidation message can serve
+    an outdated value. `generation` counts invalidations, so a value fetched or
+    computed across one can be recognized and not stored.
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = 0
+        self._entries: "OrderedDict[str, Tuple[float, CacheEntry]]" = OrderedDict()
+        self._tag_index: Dict[str, Set[str]] = {}
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+
+        expires_at, entry = item
+        if expires_at <= time.time():
+            self._remove(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        self._remove(key)
+        self._entries[key] = (min(time.time() + self.ttl, entry.stale_until), entry)
+        for tag in entry.tags:
+            self._tag_index.setdefault(tag, set()).add(key)
+
+        while len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tags: Iterable[str]):
+        self.generation += 1
+        for tag in tags:
+            for key in self._tag_index.pop(tag, ()):
+                self._remove(key)
+
+    def _remove(self, key: str):
+        item = self._entries.pop(key, None)
+        if item is None:
+            return
+        for tag in item[1].tags:
+            keys = self._tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+    def clear(self):
+        self.generation += 1
+        self._entries.clear()
+        self._tag_index.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ResponseCache:
+    """Two-tier cache for route handlers and service functions.
+
+    Lookups go to the in-process L1 first, then to Redis (L2). Values are
+    validated into, and serialized through, the function's Pydantic return model.
+
+    - Concurrent misses for the same key in a worker share one computation.
+    - Entries past their TTL but within `stale_ttl` are served as-is while one
+      worker (holding a short Redis lock) recomputes them in the background.
+    - Entries can be tagged, e.g. `tags=["user:{uid}"]` formatted with the
+      function's arguments, and dropped by tag with `invalidate()` in every worker.
+
+    Per-function hit counts, hit ratio and latency are recorded under `cache.<name>`.
+    """
+
+    CHANNEL = "cache-invalidate"
+
+    def __init__(self, l1_size: int, l1_ttl: int, enabled: bool = True):
+        self.enabled = enabled
+        self.local = LocalCache(maxsize=l1_size, ttl=l1_ttl)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def cached(
+        self,
+        ttl: int = Config.CACHE_DEFAULT_TTL_SECONDS,
+        stale_ttl: int = Config.CACHE_STALE_TTL_SECONDS,
+        tags: Sequence[str] = (),
+        model: Any = None,
+        name: Optional[str] = None,
+        key: Optional[Callable[..., str]] = None,
+    ):
+        """Cache an async function's result.
+
+        `model` defaults to the return annotation. The cache key is built from the
+        arguments, minus requests, responses, background tasks and DB sessions;
+        pass `key` to build it yourself from the same arguments.
+        """
+
+        def decorator(fn: Callable[..., Awaitable[Any]]):
+            signature = inspect.signature(fn)
+            cache_name = name or fn.__qualname__
+            return_type = model if model is not None else get_type_hints(fn).get("return", Any)
+            adapter = TypeAdapter(return_type)
+
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return await fn(*args, **kwargs)
+
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                cache_key = f"{cache_name}:{self._key(bound.arguments, key)}"
+                entry_tags = [tag.format(**bound.arguments) for tag in tags]
+
+                async def compute() -> Any:
+                    # Shared by every caller waiting on it, so it mustn't run on any one caller's session.
+                    async with self._detached(signature, bound) as arguments:
+                        return await self._compute(fn, arguments, adapter, cache_key, ttl, stale_ttl, entry_tags)
+
+                with metrics.timer(f"cache.{cache_name}"):
+                    entry, tier = self.local.get(cache_key), "l1"
+                    if entry is None:
+                        entry, tier = await self._load(cache_key, adapter), "l2"
+
+                    now = time.time()
+                    if entry is not None and entry.fresh_until > now:
+                        self._record(cache_name, f"{tier}_hit")
+                        return entry.value
+
+                    if entry is not None and entry.stale_until > now:
+                        self._record(cache_name, "stale_hit")
+                        await self._revalidate(
+                            cache_key, compute, lock_timeout=min(ttl, Config.CACHE_REVALIDATE_LOCK_SECONDS)
+                        )
+                        return entry.value
+
+                    self._record(cache_name, "miss")
+                    return await self._single_flight(cache_name, cache_key, compute)
+
+            return wrapper
+
+        return decorator
+
+    @staticmethod
+    def _key(arguments: Dict[str, Any], key: Optional[Callable[..., str]]) -> str:
+        if key is not None:
+            return key(**arguments)
+
+        relevant = {
+            name: value
+            for name, value in arguments.items()
+            if name not in ("self", "cls") and not isinstance(value, UNCACHEABLE_ARGUMENTS)
+        }
+        encoded = json.dumps(jsonable_encoder(relevant), sort_keys=True, separators=(",", ":"))
+        return hashlib.blake2b(encoded.encode(), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _record(name: str, outcome: str):
+        metrics.incr(f"cache.{name}.{outcome}")
+        hits = sum(metrics.counter(f"cache.{name}.{kind}") for kind in ("l1_hit", "l2_hit", "stale_hit"))
+        metrics.set_gauge(f"cache.{name}.hit_ratio", hits / (hits + metrics.counter(f"cache.{name}.miss")))
+
+    async def _load(self, cache_key: str, adapter: TypeAdapter) -> Optional[CacheEntry]:
+        generation = self.local.generation
+        raw = await redis_client.cache_get(cache_key)
+        if raw is None:
+            return None
+
+        try:
+            envelope = json.loads(raw)
+            entry = CacheEntry(
+                value=adapter.validate_json(envelope["value"]),
+                fresh_until=envelope["fresh_until"],
+                stale_until=envelope["stale_until"],
+                tags=envelope["tags"],
+            )
+        except (ValueError, KeyError) as e:
+            logger.warning(f"Discarding unreadable cache entry {cache_key}: {e}")
+            return None
+
+        if self.local.generation == generation:
+            self.local.set(cache_key, entry)
+        return entry
+
+    async def _compute(
+        self,
+        fn: Callable[..., Awaitable[Any]],
+        bound: inspect.BoundArguments,
+        adapter: TypeAdapter,
+        cache_key: str,
+        ttl: int,
+        stale_ttl: int,
+        tags: List[str],
+    ) -> Any:
+        # Read before computing: if any tag is invalidated meanwhile, the result is already outdated.
+        generation = self.local.generation
+        versions = await redis_client.cache_tag_versions(tags)
+        value = adapter.validate_python(await fn(*bound.args, **bound.kwargs), from_attributes=True)
+
+        now = time.time()
+        entry = CacheEntry(value, fresh_until=now + ttl, stale_until=now + ttl + stale_ttl, tags=tags)
+        stored = None
+        if versions is not None:
+            envelope = {
+                "value": adapter.dump_json(value).decode(),
+                "fresh_until": entry.fresh_until,
+                "stale_until": entry.stale_until,
+                "tags": tags,
+            }
+            stored = await redis_client.cache_set(cache_key, json.dumps(envelope), ttl + stale_ttl, tags, versions)
+
+        if stored is False or self.local.generation != generation:
+            metrics.incr("cache.invalidated_during_compute")
+        else:
+            self.local.set(cache_key, entry)
+        return value
+
+    async def _single_flight(self, name: str, cache_key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = self._start(cache_key, compute)
+        else:
+            metrics.incr(f"cache.{name}.coalesced")
+        # Shielded so one caller being cancelled doesn't cancel the work for everyone else waiting on it.
+        return await asyncio.shield(task)
+
+    def _start(self, cache_key: str, compute: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = asyncio.create_task(compute())
+        self._inflight[cache_key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        return task
+
+    @staticmethod
+    @asynccontextmanager
+    async def _detached(signature: inspect.Signature, bound: inspect.BoundArguments):
+        """Rebind `bound` with a DB session of its own.
+
+        A shared computation can outlive the request that started it (a background
+        refresh, or a miss whose first caller is cancelled while others wait), and
+        with it any session that request's dependencies handed in.
+        """
+        sessions = [name for name, value in bound.arguments.items() if isinstance(value, AsyncSession)]
+        if not sessions:
+            yield bound
+            return
+
+        async with AsyncSessionMaker() as session:
+            rebound = signature.bind(*bound.args, **bound.kwargs)
+            for name in sessions:
+                rebound.arguments[name] = session
+            yield rebound
+
+    async def _revalidate(self, cache_key: str, refresh: Callable[[], Awaitable[Any]], lock_timeout: int):
+        if cache_key in self._inflight:
+            return
+        # The lock is left to expire rather than released, so it also spaces out refreshes across workers.
+        if not await redis_client.cache_lock(cache_key, max(1, lock_timeout)):
+            return
+
+        task = self._start(cache_key, refresh)
+        task.add_done_callback(self._log_failure)
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background cache refresh failed: {task.exception()}")
+
+    async def invalidate(self, *tags: str) -> int:
+        """Drop every entry tagged with any of `tags`, in this and every other worker"""
+        self.local.invalidate(tags)
+        return await redis_client.cache_invalidate(list(tags), self.CHANNEL)
+
+    async def _run(self):
+        while True:
+            try:
+                async with redis_client.pubsub_client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.CHANNEL)
+                    async for message in subscription_messages(pubsub):
+                        if message["type"] == "message":
+                            self.local.invalidate(message["data"].split(","))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Invalidations may have been missed, so drop everything rather than serve stale entries.
+                self.local.clear()
+                logger.warning(f"Response cache lost its invalidation subscription: {e}")
+                await asyncio.sleep(1)
+
+    async def start(self):
+        if self.enabled and self._task is None and redis_client.pubsub_client is not None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.local.clear()
+
+
+response_cache = ResponseCache(
+    l1_size=Config.CACHE_L1_SIZE,
+    l1_ttl=Config.CACHE_L1_TTL_SECONDS,
+    enabled=Config.CACHE_ENABLED,
+)
+cached = response_cache.cached
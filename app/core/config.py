@@ -9,10 +9,80 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     JWT_SECRET: str
     JWT_ALGORITHM: str
+    JWT_SIGNING_KEYS_DIR: Optional[str] = None  # required for EdDSA/ES256
+    JWT_ACTIVE_KID: Optional[str] = None
+    JWT_KEYS_RELOAD_INTERVAL_SECONDS: float = 30.0  # how often JWT_SIGNING_KEYS_DIR is checked for changes
+    REFRESH_TOKEN_REUSE_GRACE_SECONDS: int = 30  # a just-rotated token still yields its successor
+
+    DB_ECHO: bool = False
+    DB_POOL_CLASS: str = "queue"  # "queue", or "null" to leave pooling to PgBouncer
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_USE_LIFO: bool = False
+    DB_CONNECT_TIMEOUT_SECONDS: float = 10.0
+    DB_COMMAND_TIMEOUT_SECONDS: Optional[float] = None
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg's own prepared statement cache
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100  # SQLAlchemy's asyncpg dialect cache
+    DB_PGBOUNCER: bool = False  # transaction pooling: disables both statement caches
+    DB_REPLICA_URLS: list[str] = []
+    DB_REPLICA_STRATEGY: str = "round_robin"  # "round_robin" or "least_busy"
+    DB_REPLICA_LAG_WINDOW_SECONDS: int = 5
+    DB_BULK_COPY_CHUNK_SIZE: int = 10000
+    DB_BULK_UPSERT_CHUNK_SIZE: int = 1000
+    DB_SLOW_QUERY_MS: float = 200.0
+    DB_EXPLAIN_SAMPLE_RATE: float = 0.0  # share of slow SELECTs re-run under EXPLAIN (ANALYZE, BUFFERS)
+    DB_QUERY_BUDGET: Optional[int] = None  # default queries allowed per request, see query_budget()
+    DB_QUERY_BUDGET_MODE: str = "warn"  # "warn", or "raise" to fail the request (for tests)
+    DB_SERVER_TIMING: bool = False  # report per-request DB time in a Server-Timing header
+    DB_STARTUP_MODE: str = "create_all"  # "create_all", "check_migrations" or "lazy"
+    ALEMBIC_CONFIG: str = "alembic.ini"
 
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: Optional[str] = None
+    REDIS_DB: int = 0
+    REDIS_MODE: str = "standalone"  # "standalone", "sentinel" or "cluster"
+    REDIS_SENTINELS: list[str] = []  # ["host:port", ...]
+    REDIS_SENTINEL_MASTER: str = "mymaster"
+    REDIS_SENTINEL_PASSWORD: Optional[str] = None
+    REDIS_CLUSTER_NODES: list[str] = []  # ["host:port", ...], defaults to REDIS_HOST:REDIS_PORT
+    REDIS_READ_FROM_REPLICAS: bool = True
+    REDIS_URL: Optional[str] = None  # takes precedence over host/port and unix socket
+    REDIS_UNIX_SOCKET_PATH: Optional[str] = None
+    REDIS_PROTOCOL: int = 2  # 2 or 3 (RESP3)
+    REDIS_PARSER: str = "auto"  # "auto", "hiredis" or "python"
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT_SECONDS: Optional[float] = 1.0
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 5.0
+    REDIS_SOCKET_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    REDIS_HEALTH_CHECK_INTERVAL_SECONDS: int = 30
+    REDIS_KEY_SCHEMA: str = "legacy"  # "legacy" or "compact"
+    REDIS_BREAKER_ENABLED: bool = True
+    REDIS_BREAKER_FAILURE_THRESHOLD: int = 5
+    REDIS_BREAKER_RESET_TIMEOUT_SECONDS: float = 10.0
+    REDIS_BREAKER_FAIL_CLOSED: list[str] = [
+        "add_to_blocklist",
+        "add_session",
+        "rotate_session",
+        "revoke_session",
+        "revoke_all_sessions",
+        "rate_limit",
+        "reserve_serials",
+    ]
+    REDIS_CLIENT_CACHE_ENABLED: bool = False
+    REDIS_CLIENT_CACHE_SIZE: int = 10000
+    REDIS_STARTUP_INFO_INTERVAL_SECONDS: int = 60
+
+    SERIAL_BACKEND: str = "redis"  # "redis" (INCRBY) or "postgres" (a sequence per prefix and year)
+    SERIAL_BLOCK_SIZE: int = 100
+
+    BLOCKLIST_LOCAL_FILTER: bool = True
+    BLOCKLIST_BATCHING_ENABLED: bool = True
+    BLOCKLIST_BATCH_MAX_SIZE: int = 128
+    BLOCKLIST_BATCH_WINDOW_US: int = 300
 
     MAIL_USERNAME: str
     MAIL_PASSWORD: str
@@ -22,8 +92,43 @@ class Settings(BaseSettings):
     MAIL_FROM_NAME: str
     MAIL_STARTTLS: bool = False
     MAIL_SSL_TLS: bool = True
+    MAIL_QUEUE_ENABLED: bool = False  # needs `python -m app.mail_worker` running; otherwise mail is sent inline
+    MAIL_QUEUE_MAX_ATTEMPTS: int = 5
+    MAIL_QUEUE_BACKOFF_BASE_SECONDS: float = 5.0
+    MAIL_QUEUE_BACKOFF_MAX_SECONDS: float = 900.0
+    MAIL_QUEUE_VISIBILITY_TIMEOUT_SECONDS: int = 120  # reclaim jobs a crashed worker left unacknowledged
+    MAIL_QUEUE_DEAD_LETTER_MAX: int = 10000
+    MAIL_WORKER_CONCURRENCY: int = 4
     EMAIL_SALT: str
 
+    PWD_HASH_EXECUTOR: str = "thread"  # "thread" or "process"
+    PWD_HASH_WORKERS: int = 4
+    PWD_HASH_QUEUE_SIZE: int = 64
+    METRICS_TOKEN: Optional[str] = None  # bearer token for /api/v1/metrics, which is off without one
+
+    ACCESS_TOKEN_CLAIMS_PROFILE: str = "full"  # "full" or "slim"
+    PROFILE_CACHE_TTL_SECONDS: int = 900
+
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False
+    LOGIN_RATE_LIMIT: int = 10
+    LOGIN_RATE_LIMIT_PERIOD_SECONDS: int = 60
+    LOGIN_IP_RATE_LIMIT: int = 60  # per client IP whatever the email, against credential stuffing
+    LOGIN_IP_RATE_LIMIT_PERIOD_SECONDS: int = 60
+    SIGNUP_RATE_LIMIT: int = 5
+    SIGNUP_RATE_LIMIT_PERIOD_SECONDS: int = 300
+
+    CACHE_ENABLED: bool = True
+    CACHE_DEFAULT_TTL_SECONDS: int = 60
+    CACHE_STALE_TTL_SECONDS: int = 30
+    CACHE_L1_SIZE: int = 1024
+    CACHE_L1_TTL_SECONDS: int = 5
+    CACHE_REVALIDATE_LOCK_SECONDS: int = 30
+
+    TOKEN_CACHE_ENABLED: bool = True
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_TTL_SECONDS: int = 300
+
     DEFAULT_PAGE_MIN_LIMIT: int = 1
     DEFAULT_PAGE_MAX_LIMIT: int = 100
     DEFAULT_PAGE_LIMIT: int = 30
@@ -1,4 +1,4 @@
-from typing import Callable, Optional
+from typing import Callable, Dict, Optional
 
 from fastapi import FastAPI, status
 from fastapi.requests import Request
@@ -95,6 +95,13 @@ class RefreshTokenExpired(AppException):
         super().__init__(message or "E402")
 
 
+class RefreshTokenReused(AppException):
+    """Raised when an already rotated or revoked refresh token is presented again."""
+
+    def __init__(self, message: Optional[str] = None):
+        super().__init__(message or "This session has been revoked. Pls log in again.")
+
+
 class ExpiredLink(AppException):
     """This handles expired password reset token"""
 
@@ -109,6 +116,14 @@ class InvalidLink(AppException):
         super().__init__(message or "Link is invalid. get a new one.")
 
 
+class InvalidCursor(AppException):
+    """Raised when a pagination cursor is tampered with or doesn't fit the query."""
+
+    def __init__(self, message: Optional[str] = None):
+        self.message = message or "Invalid pagination cursor."
+        super().__init__(self.message)
+
+
 class InsufficientPermissions(AppException):
     """Raised when user doesn't have required role/permissions"""
 
@@ -141,6 +156,31 @@ class UserSameOldPwd(AppException):
         super().__init__(self.message)
 
 
+class HashingBusy(AppException):
+    """Raised when the password hashing pool has no room for another job."""
+
+    def __init__(self, message: Optional[str] = None):
+        self.message = message or "Server is busy, please try again shortly."
+        super().__init__(self.message)
+
+
+class SessionStoreUnavailable(AppException):
+    """Raised when a refresh session can't be stored, so no refresh token is issued."""
+
+    def __init__(self, message: Optional[str] = None):
+        self.message = message or "Can't sign you in right now, please try again shortly."
+        super().__init__(self.message)
+
+
+class TooManyRequests(AppException):
+    """Raised when a client exceeds a rate limit."""
+
+    def __init__(self, message: Optional[str] = None, headers: Optional[Dict[str, str]] = None):
+        self.message = message or "Too many requests, please slow down."
+        self.headers = headers
+        super().__init__(self.message)
+
+
 def create_exception_handler(
     status_code: int, default_message: str = "An error occurred"
 ) -> Callable[[Request, Exception], JSONResponse]:
@@ -148,7 +188,9 @@ def create_exception_handler(
         message = getattr(exc, "message", default_message)
         logger.warning(f"{exc.__class__.__name__}: {message} | Path: {req.url.path}")
         response = ErrorResponse(error_code=exc.__class__.__name__, message=message)
-        return JSONResponse(status_code=status_code, content=response.model_dump())
+        return JSONResponse(
+            status_code=status_code, content=response.model_dump(), headers=getattr(exc, "headers", None)
+        )
 
     return exception_handler
 
@@ -160,8 +202,10 @@ def register_exceptions(app: FastAPI):
         AccessTokenRequired: status.HTTP_401_UNAUTHORIZED,
         RefreshTokenRequired: status.HTTP_410_GONE,
         RefreshTokenExpired: status.HTTP_410_GONE,
+        RefreshTokenReused: status.HTTP_401_UNAUTHORIZED,
         ExpiredLink: status.HTTP_410_GONE,
         InvalidLink: status.HTTP_410_GONE,
+        InvalidCursor: status.HTTP_400_BAD_REQUEST,
         NotFound: status.HTTP_404_NOT_FOUND,
         InActive: status.HTTP_404_NOT_FOUND,
         WrongCredentials: status.HTTP_404_NOT_FOUND,
@@ -172,6 +216,9 @@ def register_exceptions(app: FastAPI):
         InsufficientPermissions: status.HTTP_405_METHOD_NOT_ALLOWED,
         BadRequest: status.HTTP_400_BAD_REQUEST,
         UserSameOldPwd: status.HTTP_400_BAD_REQUEST,
+        HashingBusy: status.HTTP_503_SERVICE_UNAVAILABLE,
+        SessionStoreUnavailable: status.HTTP_503_SERVICE_UNAVAILABLE,
+        TooManyRequests: status.HTTP_429_TOO_MANY_REQUESTS,
     }
 
     for exc, code in status_map.items():
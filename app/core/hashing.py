@@ -0,0 +1,89 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from passlib.context import CryptContext
+
+from .config import Config
+from .exceptions import HashingBusy
+from .logger import setup_logger
+from .metrics import metrics
+
+logger = setup_logger(__name__)
+
+password_context = CryptContext(schemes=["bcrypt"])
+
+
+def _hash(password: str) -> str:
+    return password_context.hash(password)
+
+
+def _verify(password: str, hash: str) -> bool:
+    return password_context.verify(password, hash)
+
+
+class PasswordHasher:
+    """Runs bcrypt off the event loop on a bounded worker pool.
+
+    At most `workers` hashes run at once and at most `queue_size` more may wait
+    for a worker; anything beyond that is rejected with `HashingBusy` instead of
+    piling up behind a login burst.
+    """
+
+    def __init__(self, workers: int, queue_size: int, executor_type: str = "thread"):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.executor_type = executor_type
+        self._executor: Optional[Executor] = None
+        self._in_flight = 0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pwd-hash")
+        return self._executor
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self._in_flight - self.workers)
+
+    async def _run(self, op: str, fn: Callable, *args):
+        if self._in_flight >= self.workers + self.queue_size:
+            metrics.incr("pwd_hash.rejected")
+            logger.warning(f"Password hasher saturated, rejecting {op} ({self._in_flight} in flight)")
+            raise HashingBusy()
+
+        self._in_flight += 1
+        metrics.set_gauge("pwd_hash.queue_depth", self.queue_depth)
+        metrics.set_gauge("pwd_hash.in_flight", self._in_flight)
+        queued_at = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, fn, *args)
+        finally:
+            self._in_flight -= 1
+            metrics.observe(f"pwd_hash.{op}", time.perf_counter() - queued_at)
+            metrics.set_gauge("pwd_hash.queue_depth", self.queue_depth)
+            metrics.set_gauge("pwd_hash.in_flight", self._in_flight)
+
+    async def hash_password(self, password: str) -> str:
+        return await self._run("hash", _hash, password)
+
+    async def verify_password(self, password: str, hash: str) -> bool:
+        return await self._run("verify", _verify, password, hash)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=Config.PWD_HASH_WORKERS,
+    queue_size=Config.PWD_HASH_QUEUE_SIZE,
+    executor_type=Config.PWD_HASH_EXECUTOR,
+)
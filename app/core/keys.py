@@ -0,0 +1,174 @@
+import asyncio
+import signal
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import jwt
+from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_pem_public_key
+from jwt.algorithms import get_default_algorithms
+
+from .config import Config
+from .logger import setup_logger
+
+logger = setup_logger(__name__)
+
+ASYMMETRIC_ALGORITHMS = {"EdDSA", "ES256"}
+
+
+class KeyRing:
+    """`kid`-indexed signing and verification keys for JWTs.
+
+    With an HMAC algorithm every token is signed and verified with
+    `Config.JWT_SECRET`. With EdDSA/ES256 the keys are read from `keys_dir`:
+    `<kid>.pem` holds a private key (signing and verification) and `<kid>.pub.pem`
+    a public key kept only to verify tokens issued before a rotation. Keys are
+    parsed once and held in memory, so verification never touches PEM or disk.
+
+    `start()` watches `keys_dir` and reloads it when a key file is added, changed or
+    removed (checked every `reload_interval` seconds, or at once on SIGHUP), so a
+    `kid` can be rotated in or retired without a restart.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        keys_dir: Optional[str] = None,
+        active_kid: Optional[str] = None,
+        reload_interval: float = 30.0,
+    ):
+        self.algorithm = algorithm
+        self.keys_dir = keys_dir
+        self.active_kid = active_kid
+        self.reload_interval = reload_interval
+        self._pinned_kid = active_kid
+        self._fingerprint: Tuple = ()
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._private_keys: Dict[str, Any] = {}
+        self._public_keys: Dict[str, Any] = {}
+        self._jwks: Dict[str, list] = {"keys": []}
+
+        if self.asymmetric:
+            self.load()
+
+    @property
+    def asymmetric(self) -> bool:
+        return self.algorithm in ASYMMETRIC_ALGORITHMS
+
+    def load(self):
+        """(Re)read the key directory; call again after dropping in a new key to rotate."""
+        if not self.keys_dir:
+            raise ValueError(f"JWT_SIGNING_KEYS_DIR is required for {self.algorithm} tokens")
+
+        fingerprint = self._scan()
+        private_keys, public_keys = {}, {}
+        for path in sorted(Path(self.keys_dir).glob("*.pem")):
+            data = path.read_bytes()
+            if path.name.endswith(".pub.pem"):
+                public_keys[path.name[: -len(".pub.pem")]] = load_pem_public_key(data)
+            else:
+                kid = path.name[: -len(".pem")]
+                private_keys[kid] = load_pem_private_key(data, password=None)
+                public_keys[kid] = private_keys[kid].public_key()
+
+        if not private_keys:
+            raise ValueError(f"No private signing keys found in {self.keys_dir}")
+
+        active_kid = self._pinned_kid or max(private_keys)
+        if active_kid not in private_keys:
+            raise ValueError(f"Active key {active_kid} has no private key in {self.keys_dir}")
+
+        algorithm = get_default_algorithms()[self.algorithm]
+        self._private_keys, self._public_keys, self.active_kid = private_keys, public_keys, active_kid
+        self._fingerprint = fingerprint
+        self._jwks = {
+            "keys": [
+                {**algorithm.to_jwk(key, as_dict=True), "kid": kid, "alg": self.algorithm, "use": "sig"}
+                for kid, key in public_keys.items()
+            ]
+        }
+        logger.info(f"Loaded {len(public_keys)} JWT verification keys, signing with {active_kid}")
+
+    def _scan(self) -> Tuple:
+        return tuple(
+            (path.name, stat.st_mtime_ns, stat.st_size)
+            for path in sorted(Path(self.keys_dir).glob("*.pem"))
+            for stat in (path.stat(),)
+        )
+
+    def reload_if_changed(self) -> bool:
+        """Reload the key directory if any key file changed since the last load.
+
+        A directory that fails to load (a half-written PEM, no private key left) is
+        logged and the current keys are kept until the next check.
+        """
+        try:
+            if self._scan() == self._fingerprint:
+                return False
+            self.load()
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not reload JWT keys from {self.keys_dir}, keeping the current ones: {e}")
+            return False
+        return True
+
+    async def _watch(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.reload_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            self.reload_if_changed()
+
+    async def start(self):
+        if not self.asymmetric or self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, self._wakeup.set)
+        except (NotImplementedError, RuntimeError, AttributeError):
+            # No SIGHUP on Windows, and signal handlers only work from the main thread.
+            pass
+        self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        try:
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+        except (NotImplementedError, RuntimeError, AttributeError):
+            pass
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def signing_key(self) -> Tuple[Any, Optional[Dict[str, str]]]:
+        """Return the key and JWT headers to sign new tokens with."""
+        if not self.asymmetric:
+            return Config.JWT_SECRET, None
+        return self._private_keys[self.active_kid], {"kid": self.active_kid}
+
+    def verification_key(self, token: str) -> Any:
+        """Return the key that should have signed `token`, picked by its `kid` header."""
+        if not self.asymmetric:
+            return Config.JWT_SECRET
+
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self._public_keys.get(kid)
+        if key is None:
+            raise jwt.InvalidKeyError(f"Unknown signing key: {kid}")
+        return key
+
+    def jwks(self) -> Dict[str, list]:
+        return self._jwks
+
+
+key_ring = KeyRing(
+    algorithm=Config.JWT_ALGORITHM,
+    keys_dir=Config.JWT_SIGNING_KEYS_DIR,
+    active_kid=Config.JWT_ACTIVE_KID,
+    reload_interval=Config.JWT_KEYS_RELOAD_INTERVAL_SECONDS,
+)
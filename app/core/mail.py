@@ -8,6 +8,7 @@ from app.schemas.mail import EmailTemplates
 from app.templates.context import get_template_context
 
 from .config import Config
+from .mail_queue import mail_queue
 from .template_registry import TemplateRegistry
 
 template_registry = TemplateRegistry()
@@ -100,3 +101,27 @@ class MailerService:
         await MailerService.mail.send_message(
             message=message, template_name=EmailTemplates.WAITLIST_CONFIRMATION.template
         )
+
+    # The enqueue_* variants return once the mail is queued; `python -m app.mail_worker` sends it.
+
+    @staticmethod
+    async def enqueue_email_verification(email: str, first_name: str, verification_url: str):
+        await mail_queue.enqueue(
+            EmailTemplates.EMAIL_VERIFICATION.slug,
+            email=email,
+            first_name=first_name,
+            verification_url=verification_url,
+        )
+
+    @staticmethod
+    async def enqueue_password_reset(email: str, first_name: str, reset_url: str):
+        await mail_queue.enqueue(EmailTemplates.PWD_RESET.slug, email=email, first_name=first_name, reset_url=reset_url)
+
+    @staticmethod
+    async def enqueue_waitlist_confirmation(email: str, name: str):
+        await mail_queue.enqueue(EmailTemplates.WAITLIST_CONFIRMATION.slug, email=email, name=name)
+
+
+mail_queue.register(EmailTemplates.EMAIL_VERIFICATION.slug, MailerService.send_email_verification)
+mail_queue.register(EmailTemplates.PWD_RESET.slug, MailerService.send_password_reset)
+mail_queue.register(EmailTemplates.WAITLIST_CONFIRMATION.slug, MailerService.send_waitlist_confirmation)
@@ -0,0 +1,284 @@
+import asyncio
+import json
+import os
+import random
+import socket
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from redis.exceptions import ResponseError
+
+from app.database.redis import redis_client
+from app.utils.uuid7 import uuid7
+
+from .config import Config
+from .logger import setup_logger
+from .metrics import metrics
+
+logger = setup_logger(__name__)
+
+Sender = Callable[..., Awaitable[None]]
+
+# Moves retries that are due from the retry set back onto the stream.
+RELEASE_DUE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, job in ipairs(due) do
+    redis.call('ZREM', KEYS[1], job)
+    redis.call('XADD', KEYS[2], '*', 'job', job)
+end
+return #due
+"""
+
+
+class MailQueue:
+    """Durable mail jobs on a Redis stream, sent by `python -m app.mail_worker`.
+
+    `enqueue()` appends a job to the stream and returns; worker processes read
+    it through a consumer group, so each job goes to one sender, and acknowledge
+    it once the mail is sent. A failed send is retried with exponential backoff
+    and jitter (held in a sorted set until due), up to MAIL_QUEUE_MAX_ATTEMPTS,
+    then moved to a dead-letter list. Jobs a crashed worker left unacknowledged
+    are reclaimed after MAIL_QUEUE_VISIBILITY_TIMEOUT_SECONDS, so delivery is
+    at least once; each such delivery counts as an attempt, so a job that keeps
+    crashing its worker is dead-lettered too.
+
+    The stream is never capped, which could drop jobs not yet sent; entries are
+    deleted once acknowledged.
+
+    When the queue is disabled or Redis can't take the job, `enqueue()` sends
+    the mail inline instead, as before the queue existed.
+    """
+
+    GROUP = "mailers"
+    READ_BLOCK_MS = 2000  # below REDIS_SOCKET_TIMEOUT_SECONDS, or the blocking read times out the socket
+    MAINTENANCE_INTERVAL_SECONDS = 5.0
+    SUMMARY_INTERVAL_SECONDS = 60.0
+
+    def __init__(self, enabled: bool = False):
+        self.senders: Dict[str, Sender] = {}
+        self.enabled = enabled
+        self.consumer = f"{socket.gethostname()}:{os.getpid()}"
+        self._stopping = asyncio.Event()
+        self._last_summary = 0.0
+
+    @property
+    def stream(self) -> str:
+        return redis_client.keys.mail_queue("stream")
+
+    @property
+    def retries(self) -> str:
+        return redis_client.keys.mail_queue("retry")
+
+    @property
+    def dead_letters(self) -> str:
+        return redis_client.keys.mail_queue("dead")
+
+    def register(self, kind: str, sender: Sender):
+        """Make `sender` the function that delivers jobs of `kind`"""
+        self.senders[kind] = sender
+
+    async def enqueue(self, kind: str, **kwargs: Any):
+        """Queue a mail for the workers, or send it now if it can't be queued"""
+        if kind not in self.senders:
+            raise ValueError(f"Unknown mail job {kind!r}")
+
+        if self.enabled:
+            job = {"id": str(uuid7()), "kind": kind, "kwargs": kwargs, "attempt": 1, "enqueued_at": time.time()}
+            if await redis_client.mail_enqueue(json.dumps(job)) is not None:
+                metrics.incr("mail_queue.enqueued")
+                return
+            metrics.incr("mail_queue.sent_inline")
+
+        await self.senders[kind](**kwargs)
+
+    # Worker side
+
+    async def ensure_group(self):
+        try:
+            await redis_client.client.xgroup_create(self.stream, self.GROUP, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def run(self, concurrency: int):
+        """Send queued mail with `concurrency` senders until `stop()` is called"""
+        await self.ensure_group()
+        logger.info(f"📬 Mail worker {self.consumer} started with {concurrency} senders")
+        tasks = [asyncio.create_task(self._sender()) for _ in range(concurrency)]
+        tasks.append(asyncio.create_task(self._maintenance()))
+        await self._stopping.wait()
+        # Senders finish the job in hand; a blocked read returns within READ_BLOCK_MS.
+        await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info(f"📪 Mail worker {self.consumer} stopped")
+
+    def stop(self):
+        self._stopping.set()
+
+    async def _sender(self):
+        while not self._stopping.is_set():
+            try:
+                entries = await redis_client.client.xreadgroup(
+                    self.GROUP, self.consumer, {self.stream: ">"}, count=1, block=self.READ_BLOCK_MS
+                )
+            except Exception as e:
+                logger.warning(f"Mail worker failed to read the queue: {e}")
+                await asyncio.sleep(1)
+                continue
+
+            for _, messages in entries or []:
+                for message_id, fields in messages:
+                    try:
+                        await self._handle(message_id, fields)
+                    except Exception as e:
+                        # Left pending, so it is reclaimed after the visibility timeout.
+                        logger.warning(f"Mail worker failed to settle job {message_id}: {e}")
+
+    async def _handle(self, message_id: str, fields: Dict[str, str], deliveries: int = 1):
+        try:
+            job = json.loads(fields["job"])
+            sender = self.senders[job["kind"]]
+        except (KeyError, ValueError) as e:
+            await self._dead_letter(message_id, {"raw": fields}, f"unreadable job: {e!r}")
+            return
+
+        if deliveries > 1:
+            # Earlier deliveries of this entry ended without an outcome, most likely a worker crash.
+            job["attempt"] += deliveries - 1
+            if job["attempt"] > Config.MAIL_QUEUE_MAX_ATTEMPTS:
+                await self._dead_letter(message_id, job, f"unacknowledged after {deliveries - 1} deliveries")
+                return
+
+        try:
+            with metrics.timer("mail_queue.send"):
+                await sender(**job["kwargs"])
+        except Exception as e:
+            await self._failed(message_id, job, e)
+            return
+
+        await self._remove(message_id)
+        metrics.incr("mail_queue.sent")
+        metrics.observe("mail_queue.delivery_latency", time.time() - job["enqueued_at"])
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(Config.MAIL_QUEUE_BACKOFF_MAX_SECONDS, Config.MAIL_QUEUE_BACKOFF_BASE_SECONDS * 2 ** (attempt - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _failed(self, message_id: str, job: Dict[str, Any], error: Exception):
+        if job["attempt"] >= Config.MAIL_QUEUE_MAX_ATTEMPTS:
+            await self._dead_letter(message_id, job, repr(error))
+            return
+
+        delay = self._backoff(job["attempt"])
+        logger.warning(
+            f"Mail job {job['id']} ({job['kind']}) failed attempt {job['attempt']}, retrying in {delay:.0f}s"
+        )
+        retry = {**job, "attempt": job["attempt"] + 1, "last_error": repr(error)}
+        async with redis_client.client.pipeline(transaction=True) as pipe:
+            pipe.zadd(self.retries, {json.dumps(retry): time.time() + delay})
+            pipe.xack(self.stream, self.GROUP, message_id)
+            pipe.xdel(self.stream, message_id)
+            await pipe.execute()
+        metrics.incr("mail_queue.retried")
+
+    async def _dead_letter(self, message_id: str, job: Dict[str, Any], error: str):
+        logger.error(f"Mail job {job.get('id', message_id)} moved to the dead-letter list: {error}")
+        async with redis_client.client.pipeline(transaction=True) as pipe:
+            pipe.lpush(self.dead_letters, json.dumps({**job, "error": error, "failed_at": time.time()}))
+            pipe.ltrim(self.dead_letters, 0, Config.MAIL_QUEUE_DEAD_LETTER_MAX - 1)
+            pipe.xack(self.stream, self.GROUP, message_id)
+            pipe.xdel(self.stream, message_id)
+            await pipe.execute()
+        metrics.incr("mail_queue.dead_lettered")
+
+    async def _remove(self, message_id: str):
+        async with redis_client.client.pipeline(transaction=True) as pipe:
+            pipe.xack(self.stream, self.GROUP, message_id)
+            pipe.xdel(self.stream, message_id)
+            await pipe.execute()
+
+    async def _maintenance(self):
+        release_due = redis_client.client.register_script(RELEASE_DUE_SCRIPT)
+        while not self._stopping.is_set():
+            try:
+                released = await release_due(keys=[self.retries, self.stream], args=[time.time(), 100])
+                if released:
+                    metrics.incr("mail_queue.released", released)
+                for message_id, fields, deliveries in await self._reclaim():
+                    await self._handle(message_id, fields, deliveries)
+                await self._trim_acknowledged()
+                await self.report()
+                self._log_summary()
+            except Exception as e:
+                logger.warning(f"Mail queue maintenance failed: {e}")
+
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.MAINTENANCE_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    def _log_summary(self):
+        now = time.monotonic()
+        if now - self._last_summary < self.SUMMARY_INTERVAL_SECONDS:
+            return
+        self._last_summary = now
+        snapshot = metrics.snapshot()
+        counters = {name: value for name, value in snapshot["counters"].items() if name.startswith("mail_queue.")}
+        gauges = {name: value for name, value in snapshot["gauges"].items() if name.startswith("mail_queue.")}
+        latency = snapshot["timings"].get("mail_queue.delivery_latency", {})
+        logger.info(f"📊 Mail queue {gauges}, {counters}, delivery latency p95 {latency.get('p95_ms', 0):.0f}ms")
+
+    async def _reclaim(self) -> List[Tuple[str, Dict[str, str], int]]:
+        """Stale pending jobs, now owned by this worker, with how often each has been delivered"""
+        _, messages, _ = await redis_client.client.xautoclaim(
+            self.stream,
+            self.GROUP,
+            self.consumer,
+            min_idle_time=Config.MAIL_QUEUE_VISIBILITY_TIMEOUT_SECONDS * 1000,
+            count=100,
+        )
+        # Entries deleted since they were delivered come back empty.
+        messages = [(message_id, fields) for message_id, fields in messages if fields]
+        if not messages:
+            return []
+
+        pending = await redis_client.client.xpending_range(
+            self.stream,
+            self.GROUP,
+            min=messages[0][0],
+            max=messages[-1][0],
+            count=len(messages),
+            consumername=self.consumer,
+        )
+        deliveries = {entry["message_id"]: entry["times_delivered"] for entry in pending}
+        metrics.incr("mail_queue.reclaimed", len(messages))
+        return [(message_id, fields, deliveries.get(message_id, 1)) for message_id, fields in messages]
+
+    async def _trim_acknowledged(self):
+        """Drop entries older than anything still pending or undelivered, i.e. acknowledged ones
+        a worker didn't get to delete"""
+        pending = await redis_client.client.xpending(self.stream, self.GROUP)
+        if pending["pending"]:
+            min_id = pending["min"]
+        else:
+            groups = await redis_client.client.xinfo_groups(self.stream)
+            min_id = next(group["last-delivered-id"] for group in groups if group["name"] == self.GROUP)
+        await redis_client.client.xtrim(self.stream, minid=min_id, approximate=False)
+
+    async def stats(self) -> Dict[str, int]:
+        """Jobs waiting, being sent, scheduled for retry and dead-lettered"""
+        async with redis_client.client.pipeline(transaction=False) as pipe:
+            pipe.xlen(self.stream)
+            pipe.xpending(self.stream, self.GROUP)
+            pipe.zcard(self.retries)
+            pipe.llen(self.dead_letters)
+            length, pending, retrying, dead = await pipe.execute()
+        in_flight = pending["pending"]
+        return {"waiting": length - in_flight, "in_flight": in_flight, "retrying": retrying, "dead": dead}
+
+    async def report(self):
+        """Publish `stats()` as `mail_queue.*` gauges"""
+        for name, value in (await self.stats()).items():
+            metrics.set_gauge(f"mail_queue.{name}", value)
+
+
+mail_queue = MailQueue(enabled=Config.MAIL_QUEUE_ENABLED)
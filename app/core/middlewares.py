@@ -5,6 +5,7 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette_context import context, plugins
 from starlette_context.middleware import RawContextMiddleware
 
+from app.database.instrumentation import query_stats_middleware
 from app.utils import set_origin_from_request
 
 from .config import Config
@@ -38,6 +39,8 @@ def register_middlewares(app: FastAPI):
 
     app.add_middleware(TrustedHostMiddleware, allowed_hosts=allowed_hosts)
     app.add_middleware(BaseHTTPMiddleware, dispatch=custom_context_middleware)
+    if Config.DB_SERVER_TIMING:
+        app.add_middleware(BaseHTTPMiddleware, dispatch=query_stats_middleware)
 
     app.add_middleware(
         RawContextMiddleware,
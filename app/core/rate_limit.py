@@ -0,0 +1,139 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request, Response
+
+from app.database.redis import redis_client
+
+from .config import Config
+from .exceptions import TooManyRequests
+from .logger import setup_logger
+from .metrics import metrics
+
+logger = setup_logger(__name__)
+
+
+class LocalTokenBucket:
+    """In-process token buckets used while Redis is unreachable.
+
+    Limits are per worker, so they are looser than the shared Redis limiter, but
+    they still stop a single client from monopolizing the bcrypt pool.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, name: str, limit: int, period: int) -> Tuple[bool, int, float, float]:
+        now = time.monotonic()
+        rate = limit / period
+        tokens, updated_at = self._buckets.get(name, (float(limit), now))
+        tokens = min(float(limit), tokens + (now - updated_at) * rate)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+
+        self._buckets[name] = (tokens, now)
+        self._buckets.move_to_end(name)
+        while len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+
+        retry_after = 0.0 if allowed else (1 - tokens) / rate
+        return allowed, int(tokens), retry_after, (limit - tokens) / rate
+
+
+local_buckets = LocalTokenBucket()
+
+
+class RateLimiter:
+    """Route dependency enforcing `limit` requests per `period` seconds.
+
+    `key` picks what is limited: "ip", "email" (from the JSON body, falling back
+    to the IP) or "route" (everyone shares one budget). Decisions are made in one
+    Redis round trip; `RateLimit-*` headers are set on every response.
+    """
+
+    def __init__(self, limit: int, period: int, key: str = "ip", scope: Optional[str] = None):
+        self.limit = limit
+        self.period = period
+        self.key = key
+        self.scope = scope
+
+    @staticmethod
+    def _client_ip(request: Request) -> str:
+        forwarded_for = request.headers.get("x-forwarded-for")
+        if Config.RATE_LIMIT_TRUST_FORWARDED_FOR and forwarded_for:
+            return forwarded_for.split(",")[0].strip()
+        return request.client.host if request.client else "unknown"
+
+    async def _identity(self, request: Request) -> str:
+        if self.key == "route":
+            return "all"
+        if self.key == "email":
+            try:
+                body = await request.json()
+                if isinstance(body, dict) and body.get("email"):
+                    return f"email:{str(body['email']).lower()}"
+            except ValueError:
+                pass
+        return f"ip:{self._client_ip(request)}"
+
+    def _headers(self, remaining: int, reset_after: float) -> Dict[str, str]:
+        return {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(max(0, remaining)),
+            "RateLimit-Reset": str(math.ceil(reset_after)),
+            "RateLimit-Policy": f"{self.limit};w={self.period}",
+        }
+
+    async def __call__(self, request: Request, response: Response):
+        if not Config.RATE_LIMIT_ENABLED:
+            return
+
+        route = request.scope.get("route")
+        scope = self.scope or getattr(route, "path", request.url.path)
+        name = f"{scope}:{await self._identity(request)}"
+
+        try:
+            allowed, remaining, retry_after, reset_after = await redis_client.rate_limit(name, self.limit, self.period)
+        except Exception as e:
+            logger.warning(f"Rate limiter falling back to local buckets: {e}")
+            metrics.incr("rate_limit.local_fallback")
+            allowed, remaining, retry_after, reset_after = local_buckets.take(name, self.limit, self.period)
+
+        headers = self._headers(remaining, reset_after)
+        if not allowed:
+            metrics.incr("rate_limit.rejected")
+            raise TooManyRequests(headers={**headers, "Retry-After": str(math.ceil(retry_after))})
+
+        response.headers.update(headers)
+
+
+class RateLimits:
+    """Route dependency applying several `RateLimiter`s in turn; a request must pass all of them."""
+
+    def __init__(self, *limiters: RateLimiter):
+        self.limiters = limiters
+
+    async def __call__(self, request: Request, response: Response):
+        for limiter in self.limiters:
+            await limiter(request, response)
+
+
+# Per client IP, so one client cycling through emails is stopped, then per email, so one account
+# can't be hammered from many addresses. The IP check comes first: a client over its own limit
+# can't spend an account's budget.
+login_rate_limit = RateLimits(
+    RateLimiter(
+        limit=Config.LOGIN_IP_RATE_LIMIT, period=Config.LOGIN_IP_RATE_LIMIT_PERIOD_SECONDS, key="ip", scope="login-ip"
+    ),
+    RateLimiter(
+        limit=Config.LOGIN_RATE_LIMIT, period=Config.LOGIN_RATE_LIMIT_PERIOD_SECONDS, key="email", scope="login"
+    ),
+)
+signup_rate_limit = RateLimiter(
+    limit=Config.SIGNUP_RATE_LIMIT, period=Config.SIGNUP_RATE_LIMIT_PERIOD_SECONDS, key="ip", scope="signup"
+)
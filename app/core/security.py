@@ -1,3 +1,4 @@
+import hmac
 import logging
 from typing import Any, Dict, Optional, Union
 
@@ -5,8 +6,16 @@ from fastapi import Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from app.core.authentication import Authentication
-from app.core.exceptions import AccessTokenRequired, InvalidToken, RefreshTokenExpired, TokenExpired
+from app.core.config import Config
+from app.core.exceptions import (
+    AccessTokenRequired,
+    InvalidToken,
+    NotFound,
+    RefreshTokenExpired,
+    TokenExpired,
+)
 from app.database.redis import redis_client
+from app.database.routing import route_reads_for
 
 
 class TokenBearer(HTTPBearer):
@@ -48,6 +57,7 @@ class TokenBearer(HTTPBearer):
             raise InvalidToken()
 
         await self.verify_token_data(token_payload)
+        route_reads_for(token_payload["user"]["uid"])
         return token_payload
 
     async def verify_token_data(self, token_payload) -> None:
@@ -58,3 +68,16 @@ class AccessTokenBearer(TokenBearer):
     async def verify_token_data(self, token_payload):
         if token_payload and token_payload["refresh"]:
             raise AccessTokenRequired()
+
+
+class MetricsTokenBearer(HTTPBearer):
+    """Admits requests bearing METRICS_TOKEN; while it is unset the endpoint answers 404."""
+
+    async def __call__(self, request: Request) -> HTTPAuthorizationCredentials:
+        if not Config.METRICS_TOKEN:
+            raise NotFound()
+
+        cred = await super().__call__(request)
+        if not hmac.compare_digest(cred.credentials.encode(), Config.METRICS_TOKEN.encode()):
+            raise InvalidToken()
+        return cred
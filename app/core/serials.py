@@ -0,0 +1,108 @@
+import asyncio
+import re
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app.database.base import async_engine
+from app.database.redis import redis_client
+from app.utils import format_serial_no, serial_prefix
+
+from .config import Config
+from .metrics import metrics
+
+# Reserves about `count` numbers for (prefix, year) and returns the first and last of them.
+Reserve = Callable[[str, int, int], Awaitable[Tuple[int, int]]]
+
+
+async def reserve_from_redis(prefix: str, year: int, count: int) -> Tuple[int, int]:
+    # Counters outlive their year by a year, in case a late block is reserved across New Year.
+    expire_at = int(datetime(year + 2, 1, 1, tzinfo=timezone.utc).timestamp())
+    last = await redis_client.reserve_serials(prefix, year, count, expire_at)
+    return last - count + 1, last
+
+
+class PostgresSequences:
+    """Reserves blocks from one PostgreSQL sequence per prefix and year.
+
+    Each sequence steps by the block size, so one `nextval` reserves a whole
+    block; the block size of an existing sequence is kept even if
+    SERIAL_BLOCK_SIZE later changes.
+    """
+
+    def __init__(self):
+        self._increments: Dict[str, int] = {}
+
+    @staticmethod
+    def _name(prefix: str, year: int) -> str:
+        return f"serial_{re.sub(r'[^a-z0-9]', '_', prefix.lower())}_{year}"
+
+    async def __call__(self, prefix: str, year: int, count: int) -> Tuple[int, int]:
+        name = self._name(prefix, year)
+        async with async_engine.begin() as conn:
+            if name not in self._increments:
+                try:
+                    async with conn.begin_nested():
+                        await conn.execute(text(f"CREATE SEQUENCE IF NOT EXISTS {name} INCREMENT BY {int(count)}"))
+                except DBAPIError:
+                    pass  # created concurrently by another worker
+                increment = await conn.execute(
+                    text("SELECT increment_by FROM pg_sequences WHERE sequencename = :name"), {"name": name}
+                )
+                self._increments[name] = increment.scalar_one()
+            first = (await conn.execute(text(f"SELECT nextval('{name}')"))).scalar_one()
+        return first, first + self._increments[name] - 1
+
+
+class SerialAllocator:
+    """Hands out `PREFIX-YEAR-0001` serial numbers from blocks reserved in advance (hi/lo).
+
+    A block of `block_size` numbers per prefix and year is reserved with one
+    round trip (Redis INCRBY or a PostgreSQL sequence), then numbers are issued
+    from memory until it runs out. Numbers are unique across workers and restart
+    from 1 each year; they increase within a worker but interleave across
+    workers, and whatever is left of a block when a worker stops is skipped.
+    """
+
+    def __init__(self, block_size: int, reserve: Reserve):
+        self.block_size = block_size
+        self.reserve = reserve
+        self._blocks: Dict[Tuple[str, int], Tuple[int, int]] = {}
+        self._locks: Dict[Tuple[str, int], asyncio.Lock] = {}
+
+    async def next_number(self, prefix: str, year: int) -> int:
+        key = (prefix, year)
+        block = self._blocks.get(key)
+        if block is None or block[0] > block[1]:
+            lock = self._locks.setdefault(key, asyncio.Lock())
+            async with lock:
+                # Whoever held the lock may have refilled the block already.
+                block = self._blocks.get(key)
+                if block is None or block[0] > block[1]:
+                    with metrics.timer("serials.reserve"):
+                        block = await self.reserve(prefix, year, self.block_size)
+                    self._drop_past_years(year)
+
+        number, last = block
+        self._blocks[key] = (number + 1, last)
+        metrics.incr("serials.issued")
+        return number
+
+    async def next_serial_no(self, name: str) -> str:
+        """The next serial for `name`, formatted like `build_serial_no`"""
+        prefix, year = serial_prefix(name), datetime.now(timezone.utc).year
+        return format_serial_no(prefix, year, await self.next_number(prefix, year))
+
+    def _drop_past_years(self, year: int):
+        for key in [key for key in self._blocks if key[1] < year - 1]:
+            del self._blocks[key]
+            self._locks.pop(key, None)
+
+
+serial_allocator = SerialAllocator(
+    block_size=Config.SERIAL_BLOCK_SIZE,
+    reserve=PostgresSequences() if Config.SERIAL_BACKEND == "postgres" else reserve_from_redis,
+)
+next_serial_no = serial_allocator.next_serial_no
@@ -0,0 +1,93 @@
+import copy
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .config import Config
+from .metrics import metrics
+
+
+class TokenCache:
+    """LRU + TTL cache of verified JWT payloads, keyed by a hash of the raw token.
+
+    An entry never outlives its token's `exp` and can be dropped by `jti` as
+    soon as the token is blocklisted. Payloads are deep-copied in and out, so a
+    caller editing the nested `user` claims can't change what later hits see.
+    """
+
+    def __init__(self, maxsize: int, ttl: int, enabled: bool = True):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.enabled = enabled
+        self._entries: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._jti_index: Dict[str, bytes] = {}
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            metrics.incr("token_cache.miss")
+            return None
+
+        expires_at, payload = entry
+        if expires_at <= time.time():
+            self._remove(key)
+            metrics.incr("token_cache.miss")
+            return None
+
+        self._entries.move_to_end(key)
+        metrics.incr("token_cache.hit")
+        return copy.deepcopy(payload)
+
+    def set(self, token: str, payload: Dict[str, Any]):
+        if not self.enabled:
+            return
+
+        expires_at = time.time() + self.ttl
+        if "exp" in payload:
+            expires_at = min(expires_at, float(payload["exp"]))
+
+        key = self._key(token)
+        self._entries[key] = (expires_at, copy.deepcopy(payload))
+        self._entries.move_to_end(key)
+        if payload.get("jti"):
+            self._jti_index[payload["jti"]] = key
+
+        while len(self._entries) > self.maxsize:
+            oldest, _ = next(iter(self._entries.items()))
+            self._remove(oldest)
+            metrics.incr("token_cache.evicted")
+
+    def evict_jti(self, jti: str):
+        key = self._jti_index.get(jti)
+        if key is not None:
+            self._remove(key)
+
+    def _remove(self, key: bytes):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            jti = entry[1].get("jti")
+            if jti and self._jti_index.get(jti) == key:
+                del self._jti_index[jti]
+
+    def clear(self):
+        self._entries.clear()
+        self._jti_index.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+token_cache = TokenCache(
+    maxsize=Config.TOKEN_CACHE_SIZE,
+    ttl=Config.TOKEN_CACHE_TTL_SECONDS,
+    enabled=Config.TOKEN_CACHE_ENABLED,
+)
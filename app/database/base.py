@@ -1,18 +1,76 @@
-from typing import AsyncGenerator
+import asyncio
+from typing import AsyncGenerator, List
 
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlmodel import SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import Config
+from app.core.logger import setup_logger
 
-async_engine: AsyncEngine = create_async_engine(url=Config.DATABASE_URL)
-AsyncSessionMaker = sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+from .instrumentation import instrument_engine
+from .pool import engine_kwargs, register_pool_metrics
+from .routing import RoutingAsyncSession, RoutingSession, check_primary_pin
+
+logger = setup_logger(__name__)
+
+async_engine: AsyncEngine = create_async_engine(url=Config.DATABASE_URL, **engine_kwargs())
+register_pool_metrics(async_engine)
+instrument_engine(async_engine)
+AsyncSessionMaker = sessionmaker(
+    bind=async_engine, class_=RoutingAsyncSession, sync_session_class=RoutingSession, expire_on_commit=False
+)
+
+
+class SchemaOutOfDate(RuntimeError):
+    """Raised at start-up when the database isn't migrated to the Alembic head revision."""
+
+
+def _alembic_heads() -> List[str]:
+    # Imported here so the other start-up modes don't pay for loading Alembic.
+    from alembic.config import Config as AlembicConfig
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(AlembicConfig(Config.ALEMBIC_CONFIG)).get_heads()
+
+
+async def check_migrations():
+    """Fail fast unless `alembic_version` holds exactly the head revision(s) of the migration scripts.
+
+    Heads are read from the scripts on disk; the database is asked one query.
+    """
+    heads = set(await asyncio.to_thread(_alembic_heads))
+    async with async_engine.connect() as conn:
+        try:
+            current = set((await conn.execute(text("SELECT version_num FROM alembic_version"))).scalars())
+        except ProgrammingError:
+            current = set()
+
+    if current != heads:
+        raise SchemaOutOfDate(
+            f"Database is at revision {sorted(current) or 'none'}, expected {sorted(heads)}. "
+            "Run `alembic upgrade head`."
+        )
 
 
 async def init_db():
-    """Initializes the connection with the database."""
+    """Initializes the connection with the database, as set by `DB_STARTUP_MODE`.
+
+    "create_all" creates missing tables from the models, "check_migrations" only
+    checks the Alembic revision, and "lazy" leaves the first connection to the
+    first request.
+    """
+    if Config.DB_STARTUP_MODE == "lazy":
+        return
+
+    if Config.DB_STARTUP_MODE == "check_migrations":
+        await check_migrations()
+        logger.info("✅ Database schema is at the migration head")
+        return
+
     async with async_engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
 
@@ -21,3 +79,10 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """Creates an asynchronous session for the database"""
     async with AsyncSessionMaker() as async_session_maker:
         yield async_session_maker
+
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """Creates a read-only asynchronous session served by a read replica, when one is configured"""
+    await check_primary_pin()
+    async with AsyncSessionMaker(read_only=True) as async_session_maker:
+        yield async_session_maker
@@ -0,0 +1,156 @@
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from sqlalchemy import Table, literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import Config
+from app.core.metrics import metrics
+
+Row = Union[SQLModel, Mapping[str, Any]]
+Rows = Union[Iterable[Row], AsyncIterable[Row]]
+
+# PostgreSQL's wire protocol caps a statement at 32767 bind parameters.
+MAX_BIND_PARAMETERS = 32767
+
+
+class UpsertResult(NamedTuple):
+    inserted: int
+    updated: int
+    skipped: int  # conflicting rows left as they were (no update_columns)
+
+    @property
+    def total(self) -> int:
+        return self.inserted + self.updated + self.skipped
+
+
+def _table(model: Union[type, Table]) -> Table:
+    return model if isinstance(model, Table) else model.__table__
+
+
+def _as_dict(table: Table, row: Row) -> Dict[str, Any]:
+    if isinstance(row, SQLModel):
+        # An unset primary key is left to its sequence rather than copied in as NULL.
+        return {
+            name: value
+            for name, value in row.model_dump().items()
+            if value is not None or name not in table.primary_key.columns
+        }
+    return dict(row)
+
+
+async def _chunks(table: Table, rows: Rows, size: int) -> AsyncIterator[List[Dict[str, Any]]]:
+    chunk: List[Dict[str, Any]] = []
+    if isinstance(rows, AsyncIterable):
+        async for row in rows:
+            chunk.append(_as_dict(table, row))
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+    else:
+        for row in rows:
+            chunk.append(_as_dict(table, row))
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def _columns(table: Table, row: Dict[str, Any], columns: Optional[Sequence[str]]) -> List[str]:
+    # Columns left out are filled in by their server defaults.
+    return list(columns) if columns is not None else [name for name in row if name in table.c]
+
+
+async def bulk_insert(
+    session: AsyncSession,
+    model: Union[type, Table],
+    rows: Rows,
+    columns: Optional[Sequence[str]] = None,
+    chunk_size: int = Config.DB_BULK_COPY_CHUNK_SIZE,
+) -> int:
+    """Insert `rows` with `COPY ... FROM STDIN (FORMAT binary)`, `chunk_size` rows per COPY.
+
+    `rows` (model instances or dicts, from a plain or async iterator) are only
+    held in memory a chunk at a time. Columns default to the first row's keys;
+    the ones left out get their server defaults, but Python-side defaults and
+    ORM events don't run. Runs in the session's transaction, so it commits or
+    rolls back with everything else. Returns the number of rows copied.
+    """
+    table = _table(model)
+    connection = await session.connection()
+    driver_connection = (await connection.get_raw_connection()).driver_connection
+
+    copied = 0
+    with metrics.timer("db_bulk.copy"):
+        async for chunk in _chunks(table, rows, chunk_size):
+            names = _columns(table, chunk[0], columns)
+            await driver_connection.copy_records_to_table(
+                table.name,
+                schema_name=table.schema,
+                columns=names,
+                records=[tuple(row.get(name) for name in names) for row in chunk],
+            )
+            copied += len(chunk)
+    metrics.incr("db_bulk.copied", copied)
+    return copied
+
+
+async def bulk_upsert(
+    session: AsyncSession,
+    model: Union[type, Table],
+    rows: Rows,
+    conflict_columns: Sequence[str],
+    update_columns: Optional[Sequence[str]] = None,
+    chunk_size: int = Config.DB_BULK_UPSERT_CHUNK_SIZE,
+) -> UpsertResult:
+    """Insert `rows` with multi-row `INSERT ... ON CONFLICT`, `chunk_size` rows per statement.
+
+    On a conflict over `conflict_columns` (a unique index), `update_columns`
+    are overwritten from the new row; by default every inserted column except
+    the conflict columns, and with `update_columns=()` conflicting rows are
+    skipped. Chunks are shrunk to stay under PostgreSQL's bind parameter limit.
+    Each row of a chunk must have the same keys, and a chunk must not hold two
+    rows for the same conflict key.
+    """
+    table = _table(model)
+    inserted = updated = skipped = 0
+    with metrics.timer("db_bulk.upsert"):
+        async for chunk in _chunks(table, rows, chunk_size):
+            names = _columns(table, chunk[0], None)
+            per_statement = max(1, MAX_BIND_PARAMETERS // len(names))
+            for start in range(0, len(chunk), per_statement):
+                end = start + per_statement
+                batch = [{name: row.get(name) for name in names} for row in chunk[start:end]]
+                statement = insert(table).values(batch)
+                targets = [name for name in names if name not in conflict_columns]
+                targets = targets if update_columns is None else list(update_columns)
+                if targets:
+                    statement = statement.on_conflict_do_update(
+                        index_elements=conflict_columns, set_={name: statement.excluded[name] for name in targets}
+                    )
+                else:
+                    statement = statement.on_conflict_do_nothing(index_elements=conflict_columns)
+
+                # xmax is 0 on a freshly inserted row version and set on one written by the update.
+                result = await session.execute(statement.returning(literal_column("(xmax = 0)")))
+                written = result.scalars().all()
+                inserted += sum(written)
+                updated += len(written) - sum(written)
+                skipped += len(batch) - len(written)
+
+    metrics.incr("db_bulk.upserted", inserted + updated)
+    return UpsertResult(inserted=inserted, updated=updated, skipped=skipped)
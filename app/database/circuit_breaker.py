@@ -0,0 +1,105 @@
+import asyncio
+import time
+from enum import StrEnum
+from typing import Any, Awaitable, Callable
+
+from redis.exceptions import ConnectionError, MaxConnectionsError, TimeoutError
+
+from app.core.logger import setup_logger
+from app.core.metrics import metrics
+
+from .redis_pool import PoolExhausted
+
+logger = setup_logger(__name__)
+
+BREAKER_ERRORS = (ConnectionError, TimeoutError, OSError, asyncio.TimeoutError)
+# Running out of local pool connections says nothing about Redis's health.
+NON_BREAKER_ERRORS = (PoolExhausted, MaxConnectionsError)
+
+
+class CircuitState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Stops calling a failing dependency until it has had time to recover.
+
+    After `failure_threshold` consecutive connection/timeout failures (but not
+    local pool exhaustion) the circuit opens and calls fail immediately with
+    `CircuitOpen`. Once `reset_timeout` seconds have passed a single trial call
+    is let through (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float, enabled: bool = True):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.enabled = enabled
+        self._failures = 0
+        self._opened_at = 0.0
+        self._state = CircuitState.CLOSED
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state == CircuitState.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._set_state(CircuitState.HALF_OPEN)
+        return self._state
+
+    def _set_state(self, state: CircuitState):
+        if state != self._state:
+            logger.warning(f"Circuit {self.name}: {self._state} -> {state}")
+            self._state = state
+            metrics.set_gauge(f"circuit.{self.name}.open", 0 if state == CircuitState.CLOSED else 1)
+            metrics.incr(f"circuit.{self.name}.{state}")
+
+    def _allow(self) -> bool:
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self._failures = 0
+        self._trial_in_flight = False
+        self._set_state(CircuitState.CLOSED)
+
+    def record_failure(self):
+        self._failures += 1
+        self._trial_in_flight = False
+        metrics.incr(f"circuit.{self.name}.failures")
+        if self._state == CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._set_state(CircuitState.OPEN)
+
+    async def call(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        if not self.enabled:
+            return await fn(*args, **kwargs)
+
+        if not self._allow():
+            metrics.incr(f"circuit.{self.name}.short_circuited")
+            raise CircuitOpen(f"Circuit {self.name} is open")
+
+        try:
+            result = await fn(*args, **kwargs)
+        except NON_BREAKER_ERRORS:
+            self._trial_in_flight = False
+            raise
+        except BREAKER_ERRORS:
+            self.record_failure()
+            raise
+        except BaseException:
+            self._trial_in_flight = False
+            raise
+
+        self.record_success()
+        return result
@@ -0,0 +1,167 @@
+import asyncio
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set
+
+import redis.asyncio as aioredis
+from redis.asyncio.connection import AbstractConnection
+from redis.exceptions import ConnectionError
+
+from app.core.logger import setup_logger
+from app.core.metrics import metrics
+
+from .redis_pool import create_connection_pool
+
+logger = setup_logger(__name__)
+
+_MISSING = object()
+
+
+class TrackedKeyCache:
+    """Process-local copies of hot Redis string keys, invalidated by the server.
+
+    Reads go through a small pool whose connections turn on `CLIENT TRACKING`
+    with their invalidations redirected to one subscriber connection. Redis then
+    remembers every key read this way and publishes its name on
+    `__redis__:invalidate` as soon as it is written, deleted or expires. Values
+    (including "no such key") are served from memory only while that
+    subscription is live (`synced`); losing it drops everything cached.
+    """
+
+    CHANNEL = "__redis__:invalidate"
+    IDLE_PING_SECONDS = 5.0
+
+    def __init__(self, maxsize: int, enabled: bool = False):
+        self.maxsize = maxsize
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, Optional[str]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._fetching: Set[str] = set()
+        self._invalidated: Set[str] = set()
+        self._ready = asyncio.Event()
+        self._redirect_id: Optional[int] = None
+        self._client: Optional[aioredis.Redis] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def synced(self) -> bool:
+        return self._ready.is_set()
+
+    async def get(self, name: str) -> Optional[str]:
+        value = self._entries.get(name, _MISSING)
+        if value is not _MISSING:
+            self._entries.move_to_end(name)
+            metrics.incr("redis_client_cache.hit")
+            return value
+
+        metrics.incr("redis_client_cache.miss")
+        task = self._inflight.get(name)
+        if task is None:
+            task = asyncio.create_task(self._fetch(name))
+            self._inflight[name] = task
+            task.add_done_callback(lambda _: self._inflight.pop(name, None))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, name: str) -> Optional[str]:
+        self._fetching.add(name)
+        try:
+            value = await self._client.get(name)
+        finally:
+            self._fetching.discard(name)
+            # An invalidation that raced the read means the value may already be outdated.
+            outdated = name in self._invalidated
+            self._invalidated.discard(name)
+
+        if not outdated and self.synced:
+            self._entries[name] = value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            metrics.set_gauge("redis_client_cache.size", len(self._entries))
+        return value
+
+    def _invalidate(self, names: Optional[List[str]]):
+        if names is None:  # FLUSHDB / FLUSHALL
+            self._clear()
+            return
+
+        for name in names:
+            self._entries.pop(name, None)
+            if name in self._fetching:
+                self._invalidated.add(name)
+        metrics.incr("redis_client_cache.invalidated", len(names))
+        metrics.set_gauge("redis_client_cache.size", len(self._entries))
+
+    def _clear(self):
+        self._entries.clear()
+        self._invalidated.update(self._fetching)
+        metrics.set_gauge("redis_client_cache.size", 0)
+
+    async def _enable_tracking(self, connection: AbstractConnection):
+        await connection.on_connect()
+        await connection.send_command("CLIENT", "TRACKING", "ON", "REDIRECT", self._redirect_id)
+        if await connection.read_response() != "OK":
+            raise ConnectionError("CLIENT TRACKING was refused")
+
+    async def _subscribe(self) -> AbstractConnection:
+        # RESP2 keeps the subscriber a plain pub/sub connection whatever REDIS_PROTOCOL is.
+        connection = create_connection_pool(protocol=2).make_connection()
+        await connection.connect()
+        await connection.send_command("CLIENT", "ID", check_health=False)
+        self._redirect_id = await connection.read_response()
+        await connection.send_command("SUBSCRIBE", self.CHANNEL, check_health=False)
+        await connection.read_response()
+        return connection
+
+    async def _run(self):
+        while True:
+            connection = None
+            try:
+                connection = await self._subscribe()
+                # Connections tracked for an earlier subscriber redirect to a client id that is gone.
+                await self._client.connection_pool.disconnect()
+                self._ready.set()
+                logger.info("Redis client-side cache is tracking keys")
+                while True:
+                    message = await connection.read_response(timeout=self.IDLE_PING_SECONDS)
+                    if message is None:
+                        # A subscribed connection answers PING with a message, so no health-check round trip.
+                        await connection.send_command("PING", check_health=False)
+                    elif message[0] == "message":
+                        self._invalidate(message[2])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Redis client-side cache lost its invalidation channel, reading from Redis: {e}")
+                await asyncio.sleep(1)
+            finally:
+                self._ready.clear()
+                self._clear()
+                if connection is not None:
+                    await connection.disconnect()
+
+    async def start(self, timeout: float = 5):
+        if not self.enabled or self._task is not None:
+            return
+
+        self._client = aioredis.Redis.from_pool(
+            create_connection_pool(redis_connect_func=self._enable_tracking, metrics_prefix="redis_client_cache.pool")
+        )
+        self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Redis client-side cache not ready, tracked keys will be read from Redis until it is")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
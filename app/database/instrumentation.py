@@ -0,0 +1,202 @@
+import asyncio
+import contextvars
+import random
+import re
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette_context import context
+from starlette_context.header_keys import HeaderKeys
+
+from app.core.config import Config
+from app.core.logger import setup_logger
+from app.core.metrics import metrics
+
+logger = setup_logger(__name__)
+
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\$\d+|\?|%\(\w+\)s)(?:\s*,\s*(?:\$\d+|\?|%\(\w+\)s))+\s*\)")
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+_WRITES = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE|FOR\s+(UPDATE|SHARE|NO\s+KEY|KEY))\b", re.IGNORECASE)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Raised when a request runs more queries than its budget and DB_QUERY_BUDGET_MODE is "raise"."""
+
+
+def normalize_sql(statement: str, max_length: int = 2000) -> str:
+    """`statement` with literals and parameters replaced by `?` and IN-lists folded, so that
+    the same query logs the same way whatever its arguments."""
+    statement = _STRING.sub("?", statement)
+    statement = _PLACEHOLDER_LIST.sub("(...)", statement)
+    statement = _PLACEHOLDER.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    return statement if len(statement) <= max_length else f"{statement[:max_length]}..."
+
+
+def _request_id() -> Optional[str]:
+    return context.get(HeaderKeys.request_id) if context.exists() else None
+
+
+def query_budget(limit: int) -> Callable[[], None]:
+    """Dependency setting how many queries a route may run per request, e.g.
+    `@router.get("/items", dependencies=[Depends(query_budget(3))])`.
+
+    Going over logs a warning, or fails the request when DB_QUERY_BUDGET_MODE is
+    "raise", which is how tests catch a list endpoint that has turned N+1.
+    """
+
+    def dependency():
+        if context.exists():
+            context["db_query_budget"] = limit
+
+    return dependency
+
+
+def request_query_stats() -> tuple[int, float]:
+    """Queries run and seconds spent in the database so far by the current request."""
+    if not context.exists():
+        return 0, 0.0
+    return context.get("db_queries", 0), context.get("db_time", 0.0)
+
+
+def _record(statement: str, elapsed: float):
+    metrics.observe("db.query", elapsed)
+    if not context.exists():
+        return
+
+    queries = context["db_queries"] = context.get("db_queries", 0) + 1
+    context["db_time"] = context.get("db_time", 0.0) + elapsed
+
+    budget = context.get("db_query_budget", Config.DB_QUERY_BUDGET)
+    if budget is not None and queries == budget + 1:
+        metrics.incr("db.query_budget_exceeded")
+        message = f"Request {_request_id()} went over its budget of {budget} queries with: {normalize_sql(statement)}"
+        if Config.DB_QUERY_BUDGET_MODE == "raise":
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class SlowQueryExplainer:
+    """Re-runs a sample of slow SELECTs under `EXPLAIN (ANALYZE, BUFFERS)` and logs the plan.
+
+    Plans are taken in the background on a connection of their own, inside a
+    read-only transaction, one at a time per engine; slow statements arriving
+    while one is running aren't sampled.
+    """
+
+    def __init__(self, engine: AsyncEngine, sample_rate: float):
+        self.engine = engine
+        self.sample_rate = sample_rate
+        self._running = False
+
+    def maybe_explain(self, statement: str, parameters: Any):
+        if self._running or not _EXPLAINABLE.match(statement) or _WRITES.search(statement):
+            return
+        if random.random() >= self.sample_rate:
+            return
+
+        self._running = True
+        # A fresh context keeps the plan's own queries out of the request's count and budget.
+        task = asyncio.get_running_loop().create_task(
+            self._explain(statement, parameters, _request_id()), context=contextvars.Context()
+        )
+        task.add_done_callback(self._done)
+
+    async def _explain(self, statement: str, parameters: Any, request_id: Optional[str]):
+        async with self.engine.connect() as conn:
+            await conn.exec_driver_sql("SET TRANSACTION READ ONLY")
+            result = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters or ())
+            plan = "\n".join(row[0] for row in result)
+            await conn.rollback()
+        metrics.incr("db.explained")
+        logger.warning(f"Plan of slow query (request {request_id}): {normalize_sql(statement)}\n{plan}")
+
+    def _done(self, task: asyncio.Task):
+        self._running = False
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"EXPLAIN of a slow query failed: {task.exception()}")
+
+
+def instrument_engine(engine: AsyncEngine):
+    """Time every statement `engine` runs, count them against the current request,
+    log slow ones and sample their plans."""
+    sync_engine = engine.sync_engine
+    explainer = SlowQueryExplainer(engine, Config.DB_EXPLAIN_SAMPLE_RATE)
+    slow_seconds = Config.DB_SLOW_QUERY_MS / 1000
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, execution_context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, execution_context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        if elapsed >= slow_seconds:
+            metrics.incr("db.slow_queries")
+            logger.warning(f"Slow query ({elapsed * 1000:.1f}ms, request {_request_id()}): {normalize_sql(statement)}")
+            if explainer.sample_rate and not executemany:
+                explainer.maybe_explain(statement, parameters)
+        _record(statement, elapsed)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        starts = exception_context.connection.info.get("query_start") if exception_context.connection else None
+        if starts:
+            starts.pop()
+
+
+async def query_stats_middleware(request, call_next):
+    """Report the request's database time as a `Server-Timing` entry."""
+    response = await call_next(request)
+    queries, db_time = request_query_stats()
+    if queries:
+        response.headers.append("Server-Timing", f'db;dur={db_time * 1000:.1f};desc="{queries} queries"')
+    return response
+
+
+class QueryCounter:
+    """Statements executed on an engine while a `count_queries()` block is open."""
+
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __len__(self) -> int:
+        return self.count
+
+
+@contextmanager
+def count_queries(*engines: AsyncEngine) -> Iterator[QueryCounter]:
+    """Count the statements `engines` execute inside the block.
+
+    Meant for tests that pin down how many queries a code path runs, e.g. that
+    a list endpoint runs the same number for 1 row as for 1000. Pass the replica
+    engines too when reads are routed to them.
+
+        with count_queries(async_engine) as queries:
+            await client.get("/api/v1/items")
+        assert queries.count == 2
+    """
+    counter = QueryCounter()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter.statements.append(statement)
+
+    for engine in engines:
+        event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        for engine in engines:
+            event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
@@ -0,0 +1 @@
+from .base import TableModel  # noqa: F401
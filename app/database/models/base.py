@@ -0,0 +1,25 @@
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import DateTime
+from sqlmodel import Field, SQLModel
+
+from app.utils.uuid7 import uuid7
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class TableModel(SQLModel):
+    """Base for table models: a UUIDv7 primary key and creation/update timestamps.
+
+    UUIDv7 keys are time-ordered, so inserts stay at the end of the primary key
+    index, and a time range can be filtered on the key with `uuid7_range`.
+    """
+
+    uid: UUID = Field(default_factory=uuid7, primary_key=True)
+    created_at: datetime = Field(default_factory=utcnow, sa_type=DateTime(timezone=True))
+    updated_at: datetime = Field(
+        default_factory=utcnow, sa_type=DateTime(timezone=True), sa_column_kwargs={"onupdate": utcnow}
+    )
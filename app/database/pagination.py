@@ -0,0 +1,145 @@
+import json
+from typing import Any, List, Optional, Sequence
+
+from fastapi.encoders import jsonable_encoder
+from itsdangerous import BadSignature, URLSafeSerializer
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import Config
+from app.core.exceptions import InvalidCursor
+from app.schemas.base import CursorPaginatedResponseModel, CursorPaginationModel, SortOrderModel
+
+_serializer = URLSafeSerializer(secret_key=Config.JWT_SECRET, salt="pagination-cursor")
+
+NEXT = "next"
+PREV = "prev"
+
+
+def encode_cursor(values: Sequence[Any], direction: str, order: SortOrderModel) -> str:
+    return _serializer.dumps({"k": jsonable_encoder(list(values)), "d": direction, "o": order.value})
+
+
+def decode_cursor(cursor: str, sort_keys: Sequence[Any], order: SortOrderModel) -> tuple[List[Any], str]:
+    """Return the sort key values and direction a cursor was issued for.
+
+    Values are converted back to the columns' Python types, so a timestamp or
+    UUID compares as one rather than as the string it was encoded to.
+    """
+    try:
+        payload = _serializer.loads(cursor)
+    except BadSignature:
+        raise InvalidCursor()
+
+    values, direction = payload.get("k"), payload.get("d")
+    if payload.get("o") != order.value or direction not in (NEXT, PREV):
+        raise InvalidCursor("Pagination cursor doesn't match the requested sort order.")
+    if not isinstance(values, list) or len(values) != len(sort_keys):
+        raise InvalidCursor()
+
+    try:
+        return [_restore(key, value) for key, value in zip(sort_keys, values)], direction
+    except ValidationError:
+        raise InvalidCursor()
+
+
+def _restore(key: Any, value: Any) -> Any:
+    try:
+        python_type = key.type.python_type
+    except NotImplementedError:
+        return value
+    return TypeAdapter(python_type).validate_python(value)
+
+
+class Explain(Executable, ClauseElement):
+    """`EXPLAIN (FORMAT JSON)` of a statement, executed with the statement's own parameters."""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kw)}"
+
+
+async def estimate_total(session: AsyncSession, statement: Select) -> int:
+    """Row count the planner expects `statement` to return, from table statistics.
+
+    Costs a plan rather than a scan, so it stays cheap on large tables; it is
+    only as accurate as the last ANALYZE.
+    """
+    statement = statement.limit(None).offset(None).order_by(None)
+    result = await session.execute(Explain(statement), bind_arguments={"clause": statement})
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def paginate_by_cursor(
+    session: AsyncSession,
+    statement: Select,
+    sort_keys: Sequence[Any],
+    limit: int,
+    cursor: Optional[str] = None,
+    order: SortOrderModel = SortOrderModel.DESC,
+    include_total: bool = False,
+) -> CursorPaginatedResponseModel:
+    """Keyset pagination of `statement` over `sort_keys`.
+
+    `sort_keys` are the model columns to order by, ending with a unique one
+    (e.g. `(User.created_at, User.uid)`), and should be covered by an index in
+    that order. A page seeks past the previous page's last row with a row
+    comparison, so it costs the same however deep it is, and rows inserted or
+    deleted meanwhile don't shift what the next page returns. Cursors are signed
+    and opaque to clients.
+    """
+    unpaged = statement
+    direction, values = NEXT, None
+    if cursor:
+        values, direction = decode_cursor(cursor, sort_keys, order)
+
+    descending = (order == SortOrderModel.DESC) != (direction == PREV)
+    if values is not None:
+        keys, bounds = tuple_(*sort_keys), tuple_(*values)
+        statement = statement.where(keys < bounds if descending else keys > bounds)
+    statement = statement.order_by(None).order_by(*(key.desc() if descending else key.asc() for key in sort_keys))
+
+    rows = list((await session.exec(statement.limit(limit + 1))).all())
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == PREV:
+        rows.reverse()
+
+    def position(row: Any) -> List[Any]:
+        return [getattr(row, key.key) for key in sort_keys]
+
+    next_cursor = prev_cursor = None
+    if rows:
+        # Paging back from a page means there is one after it, just as paging forward means one before.
+        if more or direction == PREV:
+            next_cursor = encode_cursor(position(rows[-1]), NEXT, order)
+        if (more and direction == PREV) or (direction == NEXT and cursor is not None):
+            prev_cursor = encode_cursor(position(rows[0]), PREV, order)
+
+    estimated_total = None
+    if include_total:
+        estimated_total = await estimate_total(session, unpaged)
+
+    return CursorPaginatedResponseModel(
+        items=rows,
+        pagination=CursorPaginationModel(
+            limit=limit,
+            has_more=next_cursor is not None,
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor,
+            estimated_total=estimated_total,
+        ),
+    )
@@ -0,0 +1,118 @@
+import time
+import uuid
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from app.core.config import Config
+from app.core.metrics import metrics
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that reports checkout latency and waits to the metrics registry.
+
+    A checkout waits when no idle connection is left and the overflow is used up.
+    """
+
+    metrics_prefix = "db_pool"
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics_prefix = self.metrics_prefix
+        return pool
+
+    def _do_get(self):
+        contended = self._pool.empty() and 0 <= self._max_overflow <= self._overflow
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except TimeoutError:
+            metrics.incr(f"{self.metrics_prefix}.timeouts")
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.observe(f"{self.metrics_prefix}.checkout", elapsed)
+            if contended:
+                metrics.incr(f"{self.metrics_prefix}.waits")
+                metrics.observe(f"{self.metrics_prefix}.wait", elapsed)
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def engine_kwargs() -> Dict[str, Any]:
+    """`create_async_engine` options for the configured pool and asyncpg statement caching.
+
+    With `DB_PGBOUNCER` (PgBouncer in transaction mode) prepared statements can't
+    be reused across transactions, so both statement caches are disabled and each
+    prepared statement gets a unique name. `DB_POOL_CLASS="null"` leaves pooling
+    to PgBouncer altogether.
+    """
+    connect_args: Dict[str, Any] = {
+        "statement_cache_size": Config.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": Config.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        "timeout": Config.DB_CONNECT_TIMEOUT_SECONDS,
+    }
+    if Config.DB_COMMAND_TIMEOUT_SECONDS:
+        connect_args["command_timeout"] = Config.DB_COMMAND_TIMEOUT_SECONDS
+    if Config.DB_PGBOUNCER:
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=_unique_statement_name,
+        )
+
+    kwargs: Dict[str, Any] = {
+        "echo": Config.DB_ECHO,
+        "pool_pre_ping": Config.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+    if Config.DB_POOL_CLASS == "null":
+        return {**kwargs, "poolclass": NullPool}
+
+    return {
+        **kwargs,
+        "poolclass": InstrumentedAsyncPool,
+        "pool_size": Config.DB_POOL_SIZE,
+        "max_overflow": Config.DB_MAX_OVERFLOW,
+        "pool_timeout": Config.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": Config.DB_POOL_RECYCLE_SECONDS,
+        "pool_use_lifo": Config.DB_POOL_USE_LIFO,
+    }
+
+
+def register_pool_metrics(engine: AsyncEngine, prefix: str = "db_pool"):
+    """Track pool usage through SQLAlchemy pool events."""
+    pool = engine.sync_engine.pool
+    if isinstance(pool, InstrumentedAsyncPool):
+        pool.metrics_prefix = prefix
+
+    def report(returning: int = 0):
+        pool = engine.sync_engine.pool  # replaced by dispose()
+        # NullPool (DB_POOL_CLASS="null") keeps no connections, so there is nothing to count.
+        if isinstance(pool, QueuePool):
+            metrics.set_gauge(f"{prefix}.size", pool.size())
+            metrics.set_gauge(f"{prefix}.idle", min(pool.checkedin() + returning, pool.size()))
+            metrics.set_gauge(f"{prefix}.overflow", max(0, pool.overflow()))
+            metrics.set_gauge(f"{prefix}.in_use", pool.checkedout() - returning)
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        metrics.incr(f"{prefix}.connects")
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.incr(f"{prefix}.checkouts")
+        report()
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        report(returning=1)  # fired before the connection is back in the pool
+
+    @event.listens_for(pool, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.incr(f"{prefix}.invalidated")
@@ -1,21 +1,440 @@
-from typing import Optional
+import asyncio
+import base64
+import functools
+import hashlib
+import math
+import os
+import time
+from enum import IntEnum
+from typing import Any, Dict, List, Optional, Set, Tuple
+from uuid import UUID
 
-import backoff
 import redis.asyncio as aioredis
-from redis.asyncio.retry import Retry
-from redis.backoff import ExponentialBackoff
-from redis.exceptions import ConnectionError, RedisError
+from redis.commands.core import AsyncScript
+from redis.exceptions import ConnectionError
 
 from app.core.config import Config
 from app.core.logger import setup_logger
+from app.core.metrics import metrics
+from app.core.token_cache import token_cache
+
+from .circuit_breaker import CircuitBreaker, CircuitOpen
+from .client_cache import TrackedKeyCache
+from .redis_pool import create_clients, describe_target, subscription_messages
 
 logger = setup_logger(__name__)
 
 
+class KeySchema:
+    """Builds the Redis keys, members and values used for auth state.
+
+    The legacy layout stores `blocked:<uuid>` markers, refresh sessions under the
+    bare jti with the whole JWT as value and `sessions:<uid>` indexes. The compact
+    layout uses one-letter prefixes, 22-char base64url ids instead of 36-char
+    uuids, and a 16-byte token fingerprint instead of the JWT.
+
+    In cluster mode every per-user key carries a `{uid}` hash tag, so a user's
+    session index and session records share a slot and can be used together in
+    transactions and Lua scripts. Session records then need the uid to be found.
+    """
+
+    def __init__(self, compact: bool = False, cluster: bool = False):
+        self.compact = compact
+        self.cluster = cluster
+
+    @property
+    def token_in_cookie(self) -> bool:
+        """Whether the refresh cookie must carry the token, because a jti alone can't locate the session."""
+        return self.compact or self.cluster
+
+    def _user(self, uid: str) -> str:
+        user = self._shorten(uid) if self.compact else uid
+        return f"{{{user}}}" if self.cluster else user
+
+    @staticmethod
+    def _shorten(value: str) -> str:
+        try:
+            return base64.urlsafe_b64encode(UUID(value).bytes).decode().rstrip("=")
+        except ValueError:
+            return value
+
+    @staticmethod
+    def _expand(value: str) -> str:
+        if len(value) != 22:
+            return value
+        try:
+            return str(UUID(bytes=base64.urlsafe_b64decode(value + "==")))
+        except ValueError:
+            return value
+
+    @property
+    def blocked_pattern(self) -> str:
+        return "b:*" if self.compact else "blocked:*"
+
+    def blocked(self, jti: str) -> str:
+        return f"b:{self._shorten(jti)}" if self.compact else f"blocked:{jti}"
+
+    def jti_from_blocked(self, key: str) -> str:
+        jti = key.split(":", 1)[1]
+        return self._expand(jti) if self.compact else jti
+
+    def session(self, jti: str, uid: Optional[str] = None) -> str:
+        if self.cluster:
+            if uid is None:
+                raise ValueError("Session keys are tagged with the user's uid in cluster mode")
+            return f"{'s' if self.compact else 'session'}:{self._user(uid)}:{self.member(jti)}"
+        return f"s:{self._shorten(jti)}" if self.compact else jti
+
+    def session_index(self, uid: str) -> str:
+        return f"{'u' if self.compact else 'sessions'}:{self._user(uid)}"
+
+    def member(self, jti: str) -> str:
+        return self._shorten(jti) if self.compact else jti
+
+    def jti_from_member(self, member: str) -> str:
+        return self._expand(member) if self.compact else member
+
+    def profile(self, uid: str) -> str:
+        return f"{'p' if self.compact else 'profile'}:{self._user(uid)}"
+
+    def successor(self, jti: str, uid: str) -> str:
+        return f"{'sr' if self.compact else 'successor'}:{self._user(uid)}:{self.member(jti)}"
+
+    def primary_pin(self, uid: str) -> str:
+        return f"{'pp' if self.compact else 'primary-pin'}:{self._user(uid)}"
+
+    def rate_limit(self, name: str) -> str:
+        return f"rl:{name}"
+
+    def cache(self, key: str) -> str:
+        return f"{'c' if self.compact else 'cache'}:{key}"
+
+    def cache_tag(self, tag: str) -> str:
+        return f"{'ct' if self.compact else 'cache-tag'}:{tag}"
+
+    def cache_tag_version(self, tag: str) -> str:
+        return f"{'cv' if self.compact else 'cache-tag-version'}:{tag}"
+
+    def cache_lock(self, key: str) -> str:
+        return f"{'cl' if self.compact else 'cache-lock'}:{key}"
+
+    def serial(self, prefix: str, year: int) -> str:
+        return f"{'sn' if self.compact else 'serial'}:{prefix}:{year}"
+
+    def mail_queue(self, part: str) -> str:
+        # One hash tag for the stream, retry set and dead letters, so scripts can move jobs between them.
+        base = "mq" if self.compact else "mail-queue"
+        return f"{{{base}}}:{part}" if self.cluster else f"{base}:{part}"
+
+    def startup_once(self, name: str) -> str:
+        return f"{'so' if self.compact else 'startup-once'}:{name}"
+
+    def session_value(self, token: str) -> str:
+        if not self.compact:
+            return token
+        return base64.urlsafe_b64encode(hashlib.sha256(token.encode()).digest()[:16]).decode().rstrip("=")
+
+
+class BlocklistFilter:
+    """Per-process set of revoked jtis kept current over Redis pub/sub.
+
+    The set is loaded with a SCAN once subscribed, so revocations published
+    while loading are not lost. While the subscription is live (`synced`) a jti
+    missing from the set is known not to be revoked and needs no round trip.
+    """
+
+    CHANNEL = "blocklist"
+
+    def __init__(self):
+        self._entries: Dict[str, float] = {}
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._next_prune = 1024
+
+    @property
+    def synced(self) -> bool:
+        return self._ready.is_set()
+
+    def add(self, jti: str, expiry: int):
+        self._entries[jti] = time.time() + expiry
+        token_cache.evict_jti(jti)
+        if len(self._entries) >= self._next_prune:
+            self._prune()
+
+    def contains(self, jti: str) -> bool:
+        expires_at = self._entries.get(jti)
+        if expires_at is None:
+            return False
+        if expires_at <= time.time():
+            del self._entries[jti]
+            return False
+        return True
+
+    def _prune(self):
+        now = time.time()
+        self._entries = {jti: exp for jti, exp in self._entries.items() if exp > now}
+        self._next_prune = max(1024, len(self._entries) * 2)
+
+    async def _load(self, client: aioredis.Redis, keys: KeySchema):
+        chunk: List[str] = []
+        async for key in client.scan_iter(match=keys.blocked_pattern, count=1000):
+            chunk.append(key)
+            if len(chunk) >= 1000:
+                await self._load_chunk(client, keys, chunk)
+                chunk = []
+        if chunk:
+            await self._load_chunk(client, keys, chunk)
+        logger.info(f"Loaded {len(self._entries)} blocklisted tokens into the local filter")
+
+    async def _load_chunk(self, client: aioredis.Redis, keys: KeySchema, names: List[str]):
+        async with client.pipeline(transaction=False) as pipe:
+            for name in names:
+                pipe.ttl(name)
+            ttls = await pipe.execute()
+        for name, ttl in zip(names, ttls):
+            if ttl and ttl > 0:
+                self.add(keys.jti_from_blocked(name), ttl)
+
+    async def _run(self, client: aioredis.Redis, keys: KeySchema, pubsub_client: aioredis.Redis):
+        while True:
+            try:
+                async with pubsub_client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.CHANNEL)
+                    await self._load(client, keys)
+                    self._ready.set()
+                    async for message in subscription_messages(pubsub):
+                        if message["type"] != "message":
+                            continue
+                        jti, _, expiry = message["data"].rpartition(":")
+                        self.add(jti, int(expiry))
+            except asyncio.CancelledError:
+                self._ready.clear()
+                raise
+            except Exception as e:
+                self._ready.clear()
+                logger.warning(f"Blocklist filter lost its subscription, falling back to Redis: {e}")
+                await asyncio.sleep(1)
+
+    async def start(
+        self,
+        client: aioredis.Redis,
+        keys: KeySchema,
+        timeout: float = 5,
+        pubsub_client: Optional[aioredis.Redis] = None,
+    ):
+        """Subscribe and load the set; `pubsub_client` is needed when `client` can't subscribe (Cluster)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(client, keys, pubsub_client or client))
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Blocklist filter not ready, blocklist checks will go to Redis until it is")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._entries.clear()
+
+
+class BlocklistBatcher:
+    """Coalesces concurrent blocklist lookups into one pipelined EXISTS round trip.
+
+    The first lookup of a batch arms a short timer; every lookup arriving before
+    it fires (or before the batch is full) shares the same pipeline and gets its
+    own result back through a future.
+    """
+
+    def __init__(self, max_batch_size: int, window_us: int):
+        self.max_batch_size = max_batch_size
+        self.window = window_us / 1_000_000
+        self._pending: Dict[str, List[asyncio.Future]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def exists(self, client: aioredis.Redis, name: str) -> bool:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(name, []).append(future)
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush(client)
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush, client)
+
+        return await future
+
+    def _flush(self, client: aioredis.Redis):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.create_task(self._resolve(client, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, client: aioredis.Redis, batch: Dict[str, List[asyncio.Future]]):
+        names = list(batch)
+        metrics.incr("blocklist_batch.batches")
+        metrics.incr("blocklist_batch.keys", len(names))
+        metrics.set_gauge(
+            "blocklist_batch.avg_size",
+            metrics.counter("blocklist_batch.keys") / metrics.counter("blocklist_batch.batches"),
+        )
+
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for name in names:
+                    pipe.exists(name)
+                results = await pipe.execute()
+        except Exception as e:
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        for name, result in zip(names, results):
+            for future in batch[name]:
+                if not future.done():
+                    future.set_result(result > 0)
+
+
+class RotationResult(IntEnum):
+    REUSED = -1
+    MISMATCH = 0
+    ROTATED = 1
+    SUPERSEDED = 2  # rotated moments ago, e.g. by a concurrent request; the successor is returned
+
+
+# KEYS: session index, old session, new session, old jti successor, old jti blocklist key (omitted under Cluster)
+# ARGV: old member, expected old value, new member, new value, ttl, now, old remaining life,
+#       blocklist channel, old jti, new token, reuse grace period
+ROTATE_SESSION_SCRIPT = """
+local stored = redis.call('GET', KEYS[2])
+if not stored then
+    -- Within the grace period, hand out the successor unless it has been revoked too.
+    local successor = redis.call('HMGET', KEYS[4], 'session', 'token')
+    if successor[2] and redis.call('EXISTS', successor[1]) == 1 then
+        return {2, successor[2]}
+    end
+    return {-1, ''}
+end
+if stored ~= ARGV[2] then
+    return {0, ''}
+end
+
+local ttl, now, old_remaining = tonumber(ARGV[5]), tonumber(ARGV[6]), tonumber(ARGV[7])
+redis.call('DEL', KEYS[2])
+redis.call('ZREM', KEYS[1], ARGV[1])
+if old_remaining > 0 and KEYS[5] then
+    redis.call('SET', KEYS[5], '', 'EX', old_remaining)
+    redis.call('PUBLISH', ARGV[8], ARGV[9] .. ':' .. old_remaining)
+end
+if tonumber(ARGV[11]) > 0 then
+    redis.call('HSET', KEYS[4], 'session', KEYS[3], 'token', ARGV[10])
+    redis.call('EXPIRE', KEYS[4], ARGV[11])
+end
+redis.call('SET', KEYS[3], ARGV[4], 'EX', ttl)
+redis.call('ZADD', KEYS[1], now + ttl, ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+redis.call('EXPIRE', KEYS[1], ttl)
+return {1, ''}
+"""
+
+
+# KEYS: entry, n tag indexes, then the n tags' versions. ARGV: value, ttl, n, the n versions read before computing.
+# Stores nothing (returns 0) if a tag was invalidated meanwhile.
+CACHE_SET_SCRIPT = """
+local n = tonumber(ARGV[3])
+for i = 1, n do
+    if (redis.call('GET', KEYS[1 + n + i]) or '0') ~= ARGV[3 + i] then
+        return 0
+    end
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+for i = 1, n do
+    redis.call('SADD', KEYS[1 + i], KEYS[1])
+    redis.call('EXPIRE', KEYS[1 + i], ARGV[2], 'NX')
+    redis.call('EXPIRE', KEYS[1 + i], ARGV[2], 'GT')
+end
+return 1
+"""
+
+# Tag versions only need to outlive any computation in flight.
+CACHE_TAG_VERSION_TTL_SECONDS = 86400
+
+
+# GCRA: KEYS: limiter key. ARGV: emission interval (ms), period (ms).
+# Returns {allowed, remaining, retry_after_ms, reset_after_ms}.
+RATE_LIMIT_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local interval, period = tonumber(ARGV[1]), tonumber(ARGV[2])
+
+local tat = math.max(tonumber(redis.call('GET', KEYS[1]) or now), now)
+local new_tat = tat + interval
+local allow_at = new_tat - period
+if now < allow_at then
+    return {0, 0, allow_at - now, tat - now}
+end
+
+redis.call('SET', KEYS[1], new_tat, 'PX', new_tat - now)
+return {1, math.floor((now - allow_at) / interval), 0, new_tat - now}
+"""
+
+
+def guarded(op: str, fallback: Any = None):
+    """Run a RedisClient operation through the circuit breaker.
+
+    Operations listed in `REDIS_BREAKER_FAIL_CLOSED` re-raise when Redis fails or
+    the circuit is open; all others log and return `fallback` instead.
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(self: "RedisClient", *args, **kwargs):
+            try:
+                return await self.breaker.call(fn, self, *args, **kwargs)
+            except Exception as e:
+                if op in Config.REDIS_BREAKER_FAIL_CLOSED:
+                    raise
+                if not isinstance(e, CircuitOpen):
+                    logger.error(f"Redis {op} failed: {e}")
+                return fallback
+
+        return wrapper
+
+    return decorator
+
+
 class RedisClient:
     _instance: Optional["RedisClient"] = None
     _client: Optional[aioredis.Redis] = None
-    _BLOCKED_PREFIX = "blocked"
+    _reader: Optional[aioredis.Redis] = None
+    _pubsub_client: Optional[aioredis.Redis] = None
+    _scripts: Dict[str, AsyncScript] = {}
+    keys = KeySchema(compact=Config.REDIS_KEY_SCHEMA == "compact", cluster=Config.REDIS_MODE == "cluster")
+    breaker = CircuitBreaker(
+        name="redis",
+        failure_threshold=Config.REDIS_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=Config.REDIS_BREAKER_RESET_TIMEOUT_SECONDS,
+        enabled=Config.REDIS_BREAKER_ENABLED,
+    )
+    blocklist_filter = BlocklistFilter()
+    tracked_keys = TrackedKeyCache(
+        maxsize=Config.REDIS_CLIENT_CACHE_SIZE,
+        enabled=Config.REDIS_CLIENT_CACHE_ENABLED and Config.REDIS_MODE == "standalone",
+    )
+    blocklist_batcher = BlocklistBatcher(
+        max_batch_size=Config.BLOCKLIST_BATCH_MAX_SIZE, window_us=Config.BLOCKLIST_BATCH_WINDOW_US
+    )
 
     def __new__(cls):
         if cls._instance is None:
@@ -26,66 +445,430 @@ class RedisClient:
         """Initialize Redis connection with retries"""
         if self._client is None:
             try:
-                retry = Retry(ExponentialBackoff(), 3)
-                url = f"redis://{Config.REDIS_HOST}:{Config.REDIS_PORT}/0"
-                if Config.REDIS_PASSWORD:
-                    url = f"redis://:{Config.REDIS_PASSWORD}@{Config.REDIS_HOST}:{Config.REDIS_PORT}/0"
-                self._client = aioredis.from_url(
-                    url=url,
-                    retry=retry,
-                    decode_responses=True,
-                    socket_timeout=5,
-                    socket_connect_timeout=5,
-                    health_check_interval=30,
-                )
+                self._client, self._reader, self._pubsub_client = create_clients()
                 # Test connection
                 await self._client.ping()
                 logger.info("Successfully connected to Redis")
             except ConnectionError as e:
                 logger.error(f"Failed to connect to Redis: {e}")
-                self._client = None
+                self._client = self._reader = self._pubsub_client = None
                 raise
             except Exception as e:
                 logger.error(f"Unexpected error connecting to Redis: {e}")
-                self._client = None
+                self._client = self._reader = self._pubsub_client = None
                 raise
 
     @property
     def client(self) -> Optional[aioredis.Redis]:
         return self._client
 
+    @property
+    def reader(self) -> Optional[aioredis.Redis]:
+        """Client for read-only lookups; a replica when one is configured"""
+        return self._reader or self._client
+
+    @property
+    def pubsub_client(self) -> Optional[aioredis.Redis]:
+        """Client that can SUBSCRIBE; a plain node connection under Cluster"""
+        return self._pubsub_client or self._client
+
+    def _multi_slot_pipeline(self) -> aioredis.client.Pipeline:
+        # Blocklist keys live in their own slots under Cluster, where MULTI can't span them.
+        return self._client.pipeline(transaction=not self.keys.cluster)
+
+    def _script(self, source: str) -> AsyncScript:
+        if source not in self._scripts:
+            self._scripts[source] = self._client.register_script(source)
+        return self._scripts[source]
+
+    def _queue_block(self, pipe: aioredis.client.Pipeline, jti: str, expiry: int):
+        pipe.set(name=self.keys.blocked(jti), value="", ex=expiry)
+        pipe.publish(BlocklistFilter.CHANNEL, f"{jti}:{expiry}")
+
+    async def start_blocklist_filter(self):
+        """Load the local blocklist filter and subscribe to revocations"""
+        if self._client and Config.BLOCKLIST_LOCAL_FILTER:
+            await self.blocklist_filter.start(self._client, self.keys, pubsub_client=self.pubsub_client)
+
+    async def start_client_cache(self):
+        """Serve session and profile reads from local memory, invalidated through CLIENT TRACKING"""
+        if self._client:
+            await self.tracked_keys.start()
+
+    async def _get_tracked(self, name: str) -> Optional[str]:
+        if self.tracked_keys.synced:
+            return await self.tracked_keys.get(name)
+        return await self.reader.get(name)
+
     async def close(self):
         """Close Redis connection"""
+        await self.blocklist_filter.stop()
+        await self.tracked_keys.stop()
         if self._client:
-            await self._client.close()
-            self._client = None
+            for client in {self._client, self.reader, self._pubsub_client or self._client}:
+                await client.aclose()
+            self._client = self._reader = self._pubsub_client = None
+            self._scripts = {}
 
-    @backoff.on_exception(backoff.expo, (ConnectionError, RedisError), max_tries=3, max_time=30)
+    @guarded("add_to_blocklist", fallback=False)
     async def add_to_blocklist(self, key: str, expiry: int = 3600) -> bool:
-        """Add token to blocklist with retry mechanism"""
+        """Add token to blocklist; fails fast through the circuit breaker instead of retrying"""
         if not self._client:
             logger.warning("Redis client not initialized")
             return False
 
-        try:
-            await self._client.set(name=f"{self._BLOCKED_PREFIX}:{key}", value="", ex=expiry)
-            return True
-        except Exception as e:
-            logger.error(f"Error adding to blocklist: {e}")
-            raise
+        async with self._client.pipeline(transaction=False) as pipe:
+            self._queue_block(pipe, key, expiry)
+            await pipe.execute()
+        self.blocklist_filter.add(key, expiry)
+        return True
 
     async def in_blocklist(self, key: str) -> bool:
         """Check if token is in blocklist"""
+        if Config.BLOCKLIST_LOCAL_FILTER and self.blocklist_filter.synced:
+            return self.blocklist_filter.contains(key)
+
+        return await self._exists_in_blocklist(key)
+
+    @guarded("in_blocklist", fallback=False)
+    async def _exists_in_blocklist(self, key: str) -> bool:
         if not self._client:
             logger.warning("Redis client not initialized")
             return False
 
-        try:
-            return await self._client.exists(f"{self._BLOCKED_PREFIX}:{key}") > 0
-        except Exception as e:
-            logger.error(f"Error checking blocklist: {e}")
+        name = self.keys.blocked(key)
+        if Config.BLOCKLIST_BATCHING_ENABLED:
+            return await self.blocklist_batcher.exists(self.reader, name)
+        return await self.reader.exists(name) > 0
+
+    @guarded("store_url_token", fallback=False)
+    async def store_url_token(self, name: str, token: str, expiry: int) -> bool:
+        """Store a verification/reset link token and confirm it was written"""
+        if not self._client:
+            logger.warning("Redis client not initialized")
             return False
 
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.set(name=name, value=token, ex=expiry)
+            pipe.get(name)
+            success, stored_token = await pipe.execute()
+        return bool(success) and stored_token == token
+
+    @guarded("get_session", fallback=None)
+    async def get_session(self, jti: str) -> Optional[str]:
+        """Return the stored value of a refresh session (the JWT, or its fingerprint in compact mode)"""
+        if not self._client:
+            logger.warning("Redis client not initialized")
+            return None
+
+        return await self._get_tracked(self.keys.session(jti))
+
+    @guarded("rate_limit", fallback=None)
+    async def rate_limit(self, name: str, limit: int, period: int) -> Tuple[bool, int, float, float]:
+        """Take one request from a GCRA limiter in a single round trip.
+
+        Returns (allowed, remaining, retry_after, reset_after) with times in seconds.
+        """
+        if not self._client:
+            raise ConnectionError("Redis client not initialized")
+
+        # Whole milliseconds, as PX rejects fractions (60000 / 7); the burst stays `limit`.
+        interval_ms = math.ceil(period * 1000 / limit)
+        allowed, remaining, retry_after, reset_after = await self._script(RATE_LIMIT_SCRIPT)(
+            keys=[self.keys.rate_limit(name)], args=[interval_ms, interval_ms * limit]
+        )
+        return bool(allowed), int(remaining), retry_after / 1000, reset_after / 1000
+
+    @guarded("set_profile", fallback=False)
+    async def set_profile(self, uid: str, profile: str, expiry: int) -> bool:
+        """Cache a serialized user profile for slim access tokens"""
+        if not self._client:
+            logger.warning("Redis client not initialized")
+            return False
+
+        await self._client.set(name=self.keys.profile(uid), value=profile, ex=expiry)
+        return True
+
+    @guarded("get_profile", fallback=None)
+    async def get_profile(self, uid: str) -> Optional[str]:
+        """Return a cached user profile, if still present"""
+        if not self._client:
+            logger.warning("Redis client not initialized")
+            return None
+
+        return await self._get_tracked(self.keys.profile(uid))
+
+    @guarded("pin_primary", fallback=False)
+    async def pin_primary(self, uid: str, expiry: int) -> bool:
+        """Send the user's database reads to the primary for `expiry` seconds"""
+        if not self._client:
+            return False
+
+        await self._client.set(self.keys.primary_pin(uid), "", ex=expiry)
+        return True
+
+    @guarded("primary_pinned", fallback=False)
+    async def primary_pinned(self, uid: str) -> bool:
+        """Whether the user wrote recently enough that replicas may not have caught up"""
+        if not self._client:
+            return False
+
+        # From the primary: a replica or the tracked cache could miss a pin set just now.
+        return bool(await self._client.exists(self.keys.primary_pin(uid)))
+
+    @guarded("add_session", fallback=False)
+    async def add_session(self, uid: str, jti: str, token: str, expiry: int) -> bool:
+        """Store a refresh session and index it under its user in one transaction"""
+        if not self._client:
+            logger.warning("Redis client not initialized")
+            return False
+
+        now = int(time.time())
+        index_key = self.keys.session_index(uid)
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.set(name=self.keys.session(jti, uid), value=self.keys.session_value(token), ex=expiry)
+            pipe.zadd(index_key, {self.keys.member(jti): now + expiry})
+            pipe.zremrangebyscore(index_key, "-inf", now)
+            pipe.expire(index_key, expiry)
+            await pipe.execute()
+        return True
+
+    @guarded("list_sessions", fallback={})
+    async def list_sessions(self, uid: str) -> Dict[str, int]:
+        """Return the user's active refresh sessions as jti -> expiry timestamp"""
+        if not self._client:
+            logger.warning("Redis client not initialized")
+            return {}
+
+        # Expired members are pruned on the next write; reading by score keeps this on a replica.
+        sessions = await self.reader.zrangebyscore(
+            self.keys.session_index(uid), int(time.time()), "+inf", withscores=True
+        )
+        return {self.keys.jti_from_member(member): int(expires_at) for member, expires_at in sessions}
+
+    @guarded("revoke_session", fallback=False)
+    async def revoke_session(self, uid: str, jti: str) -> bool:
+        """Revoke one refresh session and blocklist its jti for the rest of its life"""
+        if not self._client:
+            logger.warning("Redis client not initialized")
+            return False
+
+        index_key = self.keys.session_index(uid)
+        expires_at = await self._client.zscore(index_key, self.keys.member(jti))
+        remaining = int(expires_at - time.time()) if expires_at else 0
+
+        async with self._multi_slot_pipeline() as pipe:
+            pipe.delete(self.keys.session(jti, uid))
+            pipe.zrem(index_key, self.keys.member(jti))
+            if remaining > 0:
+                self._queue_block(pipe, jti, remaining)
+            await pipe.execute()
+
+        if remaining > 0:
+            self.blocklist_filter.add(jti, remaining)
+        return expires_at is not None
+
+    @guarded("rotate_session", fallback=(RotationResult.MISMATCH, None))
+    async def rotate_session(
+        self,
+        uid: str,
+        old_jti: str,
+        old_token: str,
+        old_expires_at: int,
+        new_jti: str,
+        new_token: str,
+        expiry: int,
+        grace: int = 0,
+    ) -> Tuple[RotationResult, Optional[str]]:
+        """Atomically replace a refresh session and blocklist the old jti in one round trip.
+
+        For `grace` seconds afterwards, presenting the old token again returns
+        SUPERSEDED with the token it was rotated to, instead of REUSED.
+        """
+        if not self._client:
+            raise ConnectionError("Redis client not initialized")
+
+        now = int(time.time())
+        code, successor = await self._script(ROTATE_SESSION_SCRIPT)(
+            keys=[
+                self.keys.session_index(uid),
+                self.keys.session(old_jti, uid),
+                self.keys.session(new_jti, uid),
+                self.keys.successor(old_jti, uid),
+                *([] if self.keys.cluster else [self.keys.blocked(old_jti)]),
+            ],
+            args=[
+                self.keys.member(old_jti),
+                self.keys.session_value(old_token),
+                self.keys.member(new_jti),
+                self.keys.session_value(new_token),
+                expiry,
+                now,
+                old_expires_at - now,
+                BlocklistFilter.CHANNEL,
+                old_jti,
+                new_token,
+                grace,
+            ],
+        )
+        result = RotationResult(code)
+
+        if result == RotationResult.ROTATED and old_expires_at > now:
+            if self.keys.cluster:
+                # The blocklist key is in another slot, so it is written after the swap.
+                await self.add_to_blocklist(old_jti, old_expires_at - now)
+            else:
+                self.blocklist_filter.add(old_jti, old_expires_at - now)
+        return result, successor or None
+
+    @guarded("revoke_all_sessions", fallback=0)
+    async def revoke_all_sessions(self, uid: str) -> int:
+        """Revoke every refresh session of a user ("log out everywhere")"""
+        if not self._client:
+            logger.warning("Redis client not initialized")
+            return 0
+
+        now = int(time.time())
+        index_key = self.keys.session_index(uid)
+        # Read from the primary: a lagging replica could miss a session created just now.
+        members = await self._client.zrange(index_key, 0, -1, withscores=True)
+        sessions = {self.keys.jti_from_member(member): int(expires_at) for member, expires_at in members}
+        async with self._multi_slot_pipeline() as pipe:
+            for jti, expires_at in sessions.items():
+                pipe.delete(self.keys.session(jti, uid))
+                if expires_at > now:
+                    self._queue_block(pipe, jti, expires_at - now)
+            pipe.delete(index_key)
+            await pipe.execute()
+
+        for jti, expires_at in sessions.items():
+            if expires_at > now:
+                self.blocklist_filter.add(jti, expires_at - now)
+        return len(sessions)
+
+    @guarded("cache_get", fallback=None)
+    async def cache_get(self, key: str) -> Optional[str]:
+        """Return a cached response entry, if present"""
+        if not self._client:
+            return None
+
+        return await self.reader.get(self.keys.cache(key))
+
+    @guarded("cache_tag_versions", fallback=None)
+    async def cache_tag_versions(self, tags: List[str]) -> Optional[List[str]]:
+        """Current invalidation count of each tag, to pass to `cache_set` once the value is computed"""
+        if not self._client:
+            return None
+
+        # One GET per tag: under Cluster the version keys live in different slots.
+        async with self._client.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.get(self.keys.cache_tag_version(tag))
+            return [version or "0" for version in await pipe.execute()]
+
+    @guarded("cache_set", fallback=None)
+    async def cache_set(
+        self, key: str, value: str, expiry: int, tags: List[str], versions: List[str]
+    ) -> Optional[bool]:
+        """Store a cached response entry and index it under its tags.
+
+        False, storing nothing, if any tag's version no longer matches `versions`:
+        the value was computed before an invalidation and is already outdated.
+        None when Redis isn't available.
+        """
+        if not self._client:
+            return None
+
+        name = self.keys.cache(key)
+        version_keys = [self.keys.cache_tag_version(tag) for tag in tags]
+        if not self.keys.cluster:
+            stored = await self._script(CACHE_SET_SCRIPT)(
+                keys=[name, *(self.keys.cache_tag(tag) for tag in tags), *version_keys],
+                args=[value, expiry, len(tags), *versions],
+            )
+            return bool(stored)
+
+        # Under Cluster the keys span slots, so the version check can't be atomic with the write.
+        async with self._client.pipeline(transaction=False) as pipe:
+            for version_key in version_keys:
+                pipe.get(version_key)
+            if [version or "0" for version in await pipe.execute()] != versions:
+                return False
+        async with self._multi_slot_pipeline() as pipe:
+            pipe.set(name, value, ex=expiry)
+            for tag in tags:
+                tag_key = self.keys.cache_tag(tag)
+                pipe.sadd(tag_key, name)
+                # A tag index must outlive every entry in it: set a TTL once, then only ever extend it.
+                pipe.expire(tag_key, expiry, nx=True)
+                pipe.expire(tag_key, expiry, gt=True)
+            await pipe.execute()
+        return True
+
+    @guarded("cache_invalidate", fallback=0)
+    async def cache_invalidate(self, tags: List[str], channel: str) -> int:
+        """Delete every cached entry under `tags` and announce the tags on `channel`"""
+        if not self._client:
+            logger.warning("Redis client not initialized")
+            return 0
+
+        tag_keys = [self.keys.cache_tag(tag) for tag in tags]
+        async with self._client.pipeline(transaction=False) as pipe:
+            for tag_key in tag_keys:
+                pipe.smembers(tag_key)
+            names = set().union(*await pipe.execute())
+
+        async with self._multi_slot_pipeline() as pipe:
+            for tag in tags:
+                # Computations that started before this won't store their result.
+                pipe.incr(self.keys.cache_tag_version(tag))
+                pipe.expire(self.keys.cache_tag_version(tag), CACHE_TAG_VERSION_TTL_SECONDS)
+            for name in names.union(tag_keys):
+                pipe.unlink(name)
+            pipe.publish(channel, ",".join(tags))
+            await pipe.execute()
+        return len(names)
+
+    @guarded("cache_lock", fallback=True)
+    async def cache_lock(self, key: str, expiry: int) -> bool:
+        """Claim the right to recompute a cache entry; True if no other worker holds it"""
+        if not self._client:
+            return True
+
+        return bool(await self._client.set(self.keys.cache_lock(key), "", ex=expiry, nx=True))
+
+    @guarded("reserve_serials")
+    async def reserve_serials(self, prefix: str, year: int, count: int, expire_at: int) -> int:
+        """Reserve the next `count` serial numbers for `prefix` in `year`; returns the last one reserved"""
+        if not self._client:
+            raise ConnectionError("Redis is not connected")
+
+        key = self.keys.serial(prefix, year)
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.incrby(key, count)
+            pipe.expireat(key, expire_at)
+            last, _ = await pipe.execute()
+        return last
+
+    @guarded("mail_enqueue")
+    async def mail_enqueue(self, job: str) -> Optional[str]:
+        """Append a mail job to the queue stream; None when Redis isn't connected.
+
+        The stream isn't capped: workers delete entries once they are acknowledged.
+        """
+        if not self._client:
+            return None
+
+        return await self._client.xadd(self.keys.mail_queue("stream"), {"job": job})
+
+    @guarded("claim_once", fallback=True)
+    async def claim_once(self, name: str, expiry: int) -> bool:
+        """True for the first worker to ask within `expiry` seconds, so a start-up task runs once per rollout"""
+        if not self._client:
+            return True
+
+        return bool(await self._client.set(self.keys.startup_once(name), os.getpid(), ex=expiry, nx=True))
+
 
 redis_client = RedisClient()
 
@@ -93,17 +876,21 @@ redis_client = RedisClient()
 async def init_redis() -> bool:
     """Initialize Redis connection with detailed status logging"""
     try:
-        logger.info(f"🔄 Connecting to Redis at {Config.REDIS_HOST}:{Config.REDIS_PORT}...")
+        logger.info(f"🔄 Connecting to Redis at {describe_target()}...")
         await redis_client.init()
 
         # Verify connection with PING
         if await redis_client.client.ping():
             logger.info("✅ Redis connection established successfully")
 
-            # Log Redis server info
-            info = await redis_client.client.info()
-            logger.info(f"📊 Redis Version: {info.get('redis_version')}")
-            logger.info(f"💾 Memory Used: {info.get('used_memory_human')}")
+            # Log Redis server info, from one worker of those starting together
+            if await redis_client.claim_once("server-info", Config.REDIS_STARTUP_INFO_INTERVAL_SECONDS):
+                info = await redis_client.client.info()
+                logger.info(f"📊 Redis Version: {info.get('redis_version')}")
+                logger.info(f"💾 Memory Used: {info.get('used_memory_human')}")
+
+            await redis_client.start_blocklist_filter()
+            await redis_client.start_client_cache()
             return True
 
     except ConnectionError as e:
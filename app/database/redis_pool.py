@@ -0,0 +1,202 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import redis.asyncio as aioredis
+from redis.asyncio.cluster import ClusterNode, RedisCluster
+from redis.asyncio.connection import BlockingConnectionPool, UnixDomainSocketConnection
+from redis.asyncio.retry import Retry
+from redis.asyncio.sentinel import Sentinel
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError
+
+from app.core.config import Config
+from app.core.metrics import metrics
+
+
+class PoolExhausted(ConnectionError):
+    """No pooled connection came free within REDIS_POOL_TIMEOUT_SECONDS: local back-pressure, not a Redis failure."""
+
+
+class InstrumentedConnectionPool(BlockingConnectionPool):
+    """BlockingConnectionPool that reports usage and checkout waits to the metrics registry."""
+
+    def __init__(self, *args, metrics_prefix: str = "redis_pool", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics_prefix = metrics_prefix
+
+    async def get_connection(self, *args, **kwargs):
+        contended = not self.can_get_connection()
+        start = time.perf_counter()
+        try:
+            connection = await super().get_connection(*args, **kwargs)
+        except ConnectionError as e:
+            # Checkout timeouts surface as a ConnectionError raised from a TimeoutError.
+            if isinstance(e.__cause__, asyncio.TimeoutError):
+                metrics.incr(f"{self.metrics_prefix}.timeouts")
+                raise PoolExhausted(str(e)) from e
+            raise
+        finally:
+            if contended:
+                metrics.incr(f"{self.metrics_prefix}.waits")
+                metrics.observe(f"{self.metrics_prefix}.wait", time.perf_counter() - start)
+
+        self._report()
+        return connection
+
+    async def release(self, connection):
+        await super().release(connection)
+        self._report()
+
+    def _report(self):
+        metrics.set_gauge(f"{self.metrics_prefix}.in_use", len(self._in_use_connections))
+        metrics.set_gauge(f"{self.metrics_prefix}.idle", len(self._available_connections))
+        metrics.set_gauge(f"{self.metrics_prefix}.max", self.max_connections)
+
+
+def _parser_class(parser: str, protocol: int):
+    if parser == "auto":
+        return None
+
+    # redis-py doesn't export its parsers; these private names have moved between releases.
+    try:
+        from redis._parsers import _AsyncHiredisParser, _AsyncRESP2Parser, _AsyncRESP3Parser
+        from redis.utils import HIREDIS_AVAILABLE
+    except ImportError as e:
+        raise RuntimeError(
+            f"REDIS_PARSER={parser!r} isn't supported by this redis-py version; use REDIS_PARSER=auto"
+        ) from e
+
+    if parser == "hiredis":
+        if not HIREDIS_AVAILABLE:
+            raise RuntimeError("REDIS_PARSER=hiredis needs the hiredis package (pip install 'redis[hiredis]')")
+        return _AsyncHiredisParser
+    if parser == "python":
+        return _AsyncRESP3Parser if protocol == 3 else _AsyncRESP2Parser
+    raise ValueError(f"Unknown REDIS_PARSER {parser!r}")
+
+
+def connection_kwargs(
+    parser: str = Config.REDIS_PARSER,
+    protocol: int = Config.REDIS_PROTOCOL,
+) -> Dict[str, Any]:
+    """Connection options shared by every Redis connection this app opens."""
+    kwargs = {
+        "db": Config.REDIS_DB,
+        "password": Config.REDIS_PASSWORD,
+        "decode_responses": True,
+        "protocol": protocol,
+        "retry": Retry(ExponentialBackoff(), 3),
+        "socket_timeout": Config.REDIS_SOCKET_TIMEOUT_SECONDS,
+        "socket_connect_timeout": Config.REDIS_SOCKET_CONNECT_TIMEOUT_SECONDS,
+        "health_check_interval": Config.REDIS_HEALTH_CHECK_INTERVAL_SECONDS,
+    }
+    parser_class = _parser_class(parser, protocol)
+    if parser_class is not None:
+        kwargs["parser_class"] = parser_class
+    return kwargs
+
+
+def describe_target() -> str:
+    if Config.REDIS_MODE == "sentinel":
+        return f"sentinel {Config.REDIS_SENTINEL_MASTER} via {','.join(Config.REDIS_SENTINELS)}"
+    if Config.REDIS_MODE == "cluster":
+        return f"cluster via {','.join(Config.REDIS_CLUSTER_NODES) or f'{Config.REDIS_HOST}:{Config.REDIS_PORT}'}"
+    if Config.REDIS_URL:
+        return Config.REDIS_URL.split("@")[-1]
+    if Config.REDIS_UNIX_SOCKET_PATH:
+        return f"unix://{Config.REDIS_UNIX_SOCKET_PATH}"
+    return f"{Config.REDIS_HOST}:{Config.REDIS_PORT}"
+
+
+def create_connection_pool(
+    parser: str = Config.REDIS_PARSER,
+    protocol: int = Config.REDIS_PROTOCOL,
+    unix_socket_path: Optional[str] = Config.REDIS_UNIX_SOCKET_PATH,
+    url: Optional[str] = Config.REDIS_URL,
+    metrics_prefix: str = "redis_pool",
+    **overrides: Any,
+) -> InstrumentedConnectionPool:
+    """Build the connection pool from `REDIS_URL`, a unix socket or `REDIS_HOST:REDIS_PORT`, in that order.
+
+    `overrides` replace individual connection options, e.g. `redis_connect_func`.
+    """
+    kwargs = {**connection_kwargs(parser=parser, protocol=protocol), **overrides}
+    pool_kwargs = {
+        "max_connections": Config.REDIS_MAX_CONNECTIONS,
+        "timeout": Config.REDIS_POOL_TIMEOUT_SECONDS,
+        "metrics_prefix": metrics_prefix,
+    }
+
+    if url:
+        return InstrumentedConnectionPool.from_url(url, **pool_kwargs, **kwargs)
+
+    if unix_socket_path:
+        return InstrumentedConnectionPool(
+            connection_class=UnixDomainSocketConnection, path=unix_socket_path, **pool_kwargs, **kwargs
+        )
+
+    return InstrumentedConnectionPool(
+        host=Config.REDIS_HOST, port=Config.REDIS_PORT, socket_keepalive=True, **pool_kwargs, **kwargs
+    )
+
+
+async def subscription_messages(pubsub: aioredis.client.PubSub, poll_interval: float = 1.0) -> AsyncIterator[dict]:
+    """Yield pub/sub messages like `PubSub.listen()`.
+
+    `listen()` blocks on a plain read, so an idle subscription is cut off after
+    `REDIS_SOCKET_TIMEOUT_SECONDS`; polling with a read timeout of its own keeps it
+    open and lets health-check PINGs go out between messages.
+    """
+    while True:
+        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=poll_interval)
+        if message is not None:
+            yield message
+
+
+def _parse_nodes(nodes: List[str]) -> List[Tuple[str, int]]:
+    return [(host, int(port)) for host, _, port in (node.rpartition(":") for node in nodes)]
+
+
+def create_clients() -> Tuple[aioredis.Redis, aioredis.Redis, aioredis.Redis]:
+    """Build the (writer, reader, pub/sub) clients for the configured `REDIS_MODE`.
+
+    standalone: one pooled client does everything.
+    sentinel:   writes go to the master, reads to a replica when `REDIS_READ_FROM_REPLICAS`.
+    cluster:    one RedisCluster client that sends read commands to replicas itself;
+                pub/sub uses a plain connection to one node since PUBLISH reaches every node.
+    """
+    if Config.REDIS_MODE == "sentinel":
+        kwargs = connection_kwargs()
+        sentinel = Sentinel(
+            _parse_nodes(Config.REDIS_SENTINELS),
+            sentinel_kwargs={
+                "password": Config.REDIS_SENTINEL_PASSWORD,
+                "socket_timeout": Config.REDIS_SOCKET_TIMEOUT_SECONDS,
+            },
+            **kwargs,
+        )
+        writer = sentinel.master_for(Config.REDIS_SENTINEL_MASTER, max_connections=Config.REDIS_MAX_CONNECTIONS)
+        reader = (
+            sentinel.slave_for(Config.REDIS_SENTINEL_MASTER, max_connections=Config.REDIS_MAX_CONNECTIONS)
+            if Config.REDIS_READ_FROM_REPLICAS
+            else writer
+        )
+        return writer, reader, writer
+
+    if Config.REDIS_MODE == "cluster":
+        kwargs = connection_kwargs()
+        kwargs.pop("db")
+        nodes = _parse_nodes(Config.REDIS_CLUSTER_NODES) or [(Config.REDIS_HOST, Config.REDIS_PORT)]
+        cluster = RedisCluster(
+            startup_nodes=[ClusterNode(host, port) for host, port in nodes],
+            read_from_replicas=Config.REDIS_READ_FROM_REPLICAS,
+            max_connections=Config.REDIS_MAX_CONNECTIONS,
+            **kwargs,
+        )
+        host, port = nodes[0]
+        pubsub = aioredis.Redis(host=host, port=port, **connection_kwargs())
+        return cluster, cluster, pubsub
+
+    client = aioredis.Redis.from_pool(create_connection_pool())
+    return client, client, client
@@ -0,0 +1,265 @@
+import asyncio
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    ClassVar,
+    Dict,
+    Generic,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from fastapi import Depends
+from sqlalchemy import any_, bindparam, func, or_
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import SelectOfScalar
+
+from app.core.exceptions import NotFound
+from app.schemas.base import BaseFilterModel, CursorFilterModel, CursorPaginatedResponseModel, RepoFilterResponseModel
+from app.utils import get_current_and_total_pages
+
+from .base import get_session
+from .pagination import paginate_by_cursor
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+ModelT = TypeVar("ModelT", bound=SQLModel)
+RepositoryT = TypeVar("RepositoryT", bound="BaseRepository")
+
+
+class BatchLoader(Generic[K, V]):
+    """Merges the `load()` calls made in the same event-loop pass into one `batch_fn` call.
+
+    `batch_fn` takes a list of distinct keys and returns a dict of the values it
+    found. Results are cached, so loading a key again doesn't query again; use
+    `clear()` / `prime()` after writing. Batches hold `lock` while they run;
+    loaders over the same session must share one, as a session can't run two
+    queries at once.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[K]], Awaitable[Dict[K, V]]],
+        max_batch_size: int = 1000,
+        lock: Optional[asyncio.Lock] = None,
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self._results: Dict[K, asyncio.Future] = {}
+        self._queue: List[Tuple[K, asyncio.Future]] = []
+        self._lock = lock or asyncio.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def load(self, key: K) -> Optional[V]:
+        future = self._results.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._results[key] = future
+            if not self._queue:
+                # Runs once every task already scheduled in this pass has queued its keys.
+                asyncio.get_running_loop().call_soon(self._dispatch)
+            self._queue.append((key, future))
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[K]) -> List[Optional[V]]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: K, value: Optional[V]):
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(value)
+        self._results[key] = future
+
+    def clear(self, key: Optional[K] = None):
+        if key is None:
+            self._results.clear()
+        else:
+            self._results.pop(key, None)
+
+    def _dispatch(self):
+        queue, self._queue = self._queue, []
+        # Held until done, or the event loop may garbage-collect it mid-batch.
+        task = asyncio.create_task(self._run_all(queue))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_all(self, queue: List[Tuple[K, asyncio.Future]]):
+        size = self.max_batch_size
+        batches = []
+        for start in range(0, len(queue), size):
+            end = start + size
+            batches.append(self._run(queue[start:end]))
+        await asyncio.gather(*batches)
+
+    async def _run(self, batch: List[Tuple[K, asyncio.Future]]):
+        try:
+            async with self._lock:
+                found = await self.batch_fn([key for key, _ in batch])
+        except Exception as e:
+            for key, future in batch:
+                if self._results.get(key) is future:
+                    del self._results[key]  # so the next load retries
+                future.set_exception(e)
+            return
+
+        for key, future in batch:
+            future.set_result(found.get(key))
+
+
+class BaseRepository(Generic[ModelT]):
+    """Data access for one SQLModel table over the request's `AsyncSession`.
+
+    Subclasses set `model`, and optionally:
+    - `id_field`: the column `get_by_id` looks rows up by, `TableModel`'s `uid` by default.
+    - `search_fields`: columns a filter's `q` is matched against (case-insensitive).
+    - `presets`: named sets of relationships to eager load with `selectinload`,
+      e.g. `{"detail": ("roles", "profile.address")}`, so a page of rows loads
+      each relationship in one extra query instead of one per row.
+
+    `get_by_id` calls for the same repository and preset are batched per session
+    (so per request) into one `WHERE id = ANY(:ids)` query by a `BatchLoader`.
+    """
+
+    model: ClassVar[Type[SQLModel]]
+    id_field: ClassVar[str] = "uid"
+    search_fields: ClassVar[Sequence[str]] = ()
+    presets: ClassVar[Dict[str, Sequence[str]]] = {}
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @property
+    def id_column(self):
+        return getattr(self.model, self.id_field)
+
+    def options(self, preset: Optional[str] = None) -> List[LoaderOption]:
+        if preset is None:
+            return []
+
+        options = []
+        for path in self.presets[preset]:
+            entity, option = self.model, None
+            for name in path.split("."):
+                attribute = getattr(entity, name)
+                option = selectinload(attribute) if option is None else option.selectinload(attribute)
+                entity = attribute.property.mapper.class_
+            options.append(option)
+        return options
+
+    def select(self, *where: Any, preset: Optional[str] = None) -> SelectOfScalar[ModelT]:
+        return select(self.model).where(*where).options(*self.options(preset))
+
+    def loader(self, preset: Optional[str] = None) -> BatchLoader[Any, ModelT]:
+        loaders: Dict[Tuple[type, Optional[str]], BatchLoader] = self.session.info.setdefault("loaders", {})
+        loader = loaders.get((type(self), preset))
+        if loader is None:
+
+            async def load(ids: List[Any]) -> Dict[Any, ModelT]:
+                ids_param = bindparam("ids", value=ids, type_=ARRAY(self.id_column.type))
+                rows = await self.session.exec(self.select(self.id_column == any_(ids_param), preset=preset))
+                return {getattr(row, self.id_field): row for row in rows.all()}
+
+            # One lock for every loader on the session, whatever the repository or preset.
+            lock = self.session.info.setdefault("loader_lock", asyncio.Lock())
+            loader = loaders[(type(self), preset)] = BatchLoader(load, lock=lock)
+        return loader
+
+    async def get_by_id(self, id: Any, preset: Optional[str] = None) -> Optional[ModelT]:
+        return await self.loader(preset).load(id)
+
+    async def get_many_by_id(self, ids: Iterable[Any], preset: Optional[str] = None) -> List[Optional[ModelT]]:
+        return await self.loader(preset).load_many(ids)
+
+    async def get_by_id_or_404(self, id: Any, preset: Optional[str] = None) -> ModelT:
+        instance = await self.get_by_id(id, preset)
+        if instance is None:
+            raise NotFound(f"{self.model.__name__} not found.")
+        return instance
+
+    async def get(self, *where: Any, preset: Optional[str] = None) -> Optional[ModelT]:
+        return (await self.session.exec(self.select(*where, preset=preset).limit(1))).first()
+
+    async def list(
+        self, *where: Any, order_by: Sequence[Any] = (), limit: Optional[int] = None, preset: Optional[str] = None
+    ) -> List[ModelT]:
+        statement = self.select(*where, preset=preset).order_by(*order_by).limit(limit)
+        return list((await self.session.exec(statement)).all())
+
+    def search(self, q: Optional[str]) -> List[Any]:
+        if not q or not self.search_fields:
+            return []
+        return [or_(*(getattr(self.model, field).ilike(f"%{q}%") for field in self.search_fields))]
+
+    async def filter(
+        self,
+        filters: BaseFilterModel,
+        *where: Any,
+        order_by: Sequence[Any] = (),
+        preset: Optional[str] = None,
+    ) -> RepoFilterResponseModel:
+        """One offset page of rows plus the exact total: two queries, plus one per preset relationship."""
+        conditions = [*where, *self.search(filters.q)]
+        total = (await self.session.exec(select(func.count()).select_from(self.model).where(*conditions))).one()
+        statement = self.select(*conditions, preset=preset).order_by(*order_by)
+        items = (await self.session.exec(statement.offset(filters.offset).limit(filters.limit))).all()
+
+        current_page, total_pages = get_current_and_total_pages(filters.limit, total, filters.offset)
+        return RepoFilterResponseModel(
+            items=list(items), current_page=current_page, total_pages=total_pages, limit=filters.limit, total=total
+        )
+
+    async def paginate(
+        self,
+        filters: CursorFilterModel,
+        sort_keys: Sequence[Any],
+        *where: Any,
+        preset: Optional[str] = None,
+    ) -> CursorPaginatedResponseModel:
+        """One keyset page of rows, see `paginate_by_cursor`."""
+        return await paginate_by_cursor(
+            self.session,
+            self.select(*where, *self.search(filters.q), preset=preset),
+            sort_keys,
+            limit=filters.limit,
+            cursor=filters.cursor,
+            order=filters.sort_order,
+            include_total=filters.include_total,
+        )
+
+    async def save(self, instance: ModelT) -> ModelT:
+        self.session.add(instance)
+        await self.session.flush()
+        for loader in self._loaders():
+            loader.clear(getattr(instance, self.id_field))
+        return instance
+
+    async def delete(self, instance: ModelT):
+        await self.session.delete(instance)
+        await self.session.flush()
+        for loader in self._loaders():
+            loader.clear(getattr(instance, self.id_field))
+
+    def _loaders(self) -> List[BatchLoader]:
+        loaders = self.session.info.get("loaders", {})
+        return [loader for (repository, _), loader in loaders.items() if repository is type(self)]
+
+
+def get_repository(repository: Type[RepositoryT]) -> Callable[[AsyncSession], RepositoryT]:
+    """Dependency providing `repository` over the request's session, e.g.
+    `users: UserRepository = Depends(get_repository(UserRepository))`."""
+
+    def dependency(session: AsyncSession = Depends(get_session)) -> RepositoryT:
+        return repository(session)
+
+    return dependency
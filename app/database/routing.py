@@ -0,0 +1,164 @@
+import itertools
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import QueuePool
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette_context import context
+
+from app.core.config import Config
+from app.core.logger import setup_logger
+from app.core.metrics import metrics
+
+from .instrumentation import instrument_engine
+from .pool import engine_kwargs, register_pool_metrics
+from .redis import redis_client
+
+logger = setup_logger(__name__)
+
+
+class ReplicaSet:
+    """Read-replica engines and the policy for choosing one.
+
+    "round_robin" rotates through the replicas; "least_busy" picks the one with
+    the fewest checked-out connections, or rotates too when the replicas are on
+    NullPool, which doesn't count them.
+    """
+
+    def __init__(self, urls: List[str], strategy: str = "round_robin"):
+        self.strategy = strategy
+        self.engines: List[AsyncEngine] = []
+        for index, url in enumerate(urls):
+            engine = create_async_engine(url=url, **engine_kwargs())
+            register_pool_metrics(engine, prefix=f"db_replica_pool.{index}")
+            instrument_engine(engine)
+            self.engines.append(engine)
+        self._next = itertools.cycle(self.engines)
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def pick(self) -> AsyncEngine:
+        # Only a QueuePool counts its connections; under NullPool "least_busy" falls back to rotating.
+        if self.strategy == "least_busy" and all(
+            isinstance(engine.sync_engine.pool, QueuePool) for engine in self.engines
+        ):
+            return min(self.engines, key=lambda engine: engine.sync_engine.pool.checkedout())
+        return next(self._next)
+
+    async def dispose(self):
+        for engine in self.engines:
+            await engine.dispose()
+
+
+class ReplicaLagGuard:
+    """Keeps a user's reads on the primary for `window` seconds after they write.
+
+    Pins are kept in process for the writing worker and in Redis for the others,
+    so a user never reads from a replica that may not have their write yet.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self._pins: Dict[str, float] = {}
+
+    async def pin(self, uid: str):
+        now = time.time()
+        self._pins = {user: until for user, until in self._pins.items() if until > now}
+        self._pins[uid] = now + self.window
+        await redis_client.pin_primary(uid, self.window)
+
+    async def pinned(self, uid: str) -> bool:
+        if self._pins.get(uid, 0) > time.time():
+            return True
+        return await redis_client.primary_pinned(uid)
+
+
+replicas = ReplicaSet(urls=Config.DB_REPLICA_URLS, strategy=Config.DB_REPLICA_STRATEGY)
+lag_guard = ReplicaLagGuard(window=Config.DB_REPLICA_LAG_WINDOW_SECONDS)
+
+
+def _request_state(name: str):
+    return context.get(name) if context.exists() else None
+
+
+def route_reads_for(uid: str):
+    """Record the request's user so their reads stay on the primary right after they write.
+
+    Called once the user is authenticated; anonymous requests are routed per session
+    only. Whether the user is pinned is looked up later, by `check_primary_pin`, so
+    requests that never open a read session don't pay the Redis round trip.
+    """
+    if replicas and context.exists():
+        context["db_user"] = uid
+
+
+async def check_primary_pin():
+    """Look up, once per request, whether the request's user must read from the primary."""
+    if not replicas or not context.exists() or "db_read_primary" in context:
+        return
+
+    uid = context.get("db_user")
+    if uid:
+        context["db_read_primary"] = await lag_guard.pinned(uid)
+
+
+class RoutingSession(Session):
+    """Session that can send its reads to a replica.
+
+    Only a `read_only` session, which a route opts into with `get_read_session`,
+    reads from a replica, and not while the request's user is pinned by the lag
+    guard. Every other session stays on the primary for its whole unit of work,
+    so a read-modify-write never writes back a stale replica read.
+    """
+
+    def __init__(self, *args, read_only: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.read_only = read_only
+        self.wrote = False
+        self._replica: Optional[AsyncEngine] = None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        writes = self._flushing or not isinstance(clause, Select) or clause._for_update_arg is not None
+        self.wrote = self.wrote or writes
+        if not replicas:
+            return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+        if self.read_only and not writes and not _request_state("db_read_primary"):
+            if self._replica is None:
+                self._replica = replicas.pick()
+            metrics.incr("db_routing.replica")
+            return self._replica.sync_engine
+
+        metrics.incr("db_routing.primary")
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+class RoutingAsyncSession(AsyncSession):
+    """AsyncSession over `RoutingSession` that pins the request's user after a write is committed.
+
+    `wrote` is cleared once the transaction ends, so a later commit that only read
+    doesn't pin the user again.
+    """
+
+    sync_session_class = RoutingSession
+
+    async def rollback(self) -> None:
+        await super().rollback()
+        self.sync_session.wrote = False
+
+    async def commit(self) -> None:
+        wrote = self.sync_session.wrote
+        await super().commit()
+        self.sync_session.wrote = False
+
+        uid = _request_state("db_user")
+        if wrote and uid:
+            context["db_read_primary"] = True
+            try:
+                await lag_guard.pin(uid)
+            except Exception as e:
+                logger.warning(f"Failed to pin reads to the primary for {uid}: {e}")
@@ -0,0 +1,36 @@
+"""Sends the mail queued with `MailerService.enqueue_*`.
+
+Usage: python -m app.mail_worker [--concurrency N]
+"""
+
+import argparse
+import asyncio
+import signal
+
+from app.core.config import Config
+from app.core.logger import setup_logger
+from app.core.mail import MailerService  # noqa: F401  (registers the senders)
+from app.core.mail_queue import mail_queue
+from app.database.redis import init_redis, redis_client
+
+logger = setup_logger("app.mail_worker")
+
+
+async def main(concurrency: int):
+    if not await init_redis():
+        raise SystemExit("Mail worker needs Redis")
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, mail_queue.stop)
+
+    try:
+        await mail_queue.run(concurrency)
+    finally:
+        await redis_client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Send queued mail.")
+    parser.add_argument("--concurrency", type=int, default=Config.MAIL_WORKER_CONCURRENCY, help="concurrent senders")
+    asyncio.run(main(parser.parse_args().concurrency))
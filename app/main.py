@@ -1,25 +1,58 @@
 import logging
-from contextlib import asynccontextmanager
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Iterator
 
+from fastapi import Depends, FastAPI, Response
+
+from app.core.cache import response_cache
 from app.core.exceptions import register_exceptions
+from app.core.hashing import password_hasher
+from app.core.keys import key_ring
 from app.core.logger import setup_logger
+from app.core.mail_queue import mail_queue
+from app.core.metrics import metrics
 from app.core.middlewares import register_middlewares
+from app.core.security import MetricsTokenBearer
 from app.database.base import init_db
-from app.database.redis import init_redis
+from app.database.redis import init_redis, redis_client
+from app.database.routing import replicas
 
 app_logger = setup_logger("app.lifecycle")
 
 
+@contextmanager
+def startup_phase(name: str) -> Iterator[None]:
+    """Record how long a start-up phase took, as the `startup.<name>_seconds` gauge."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.set_gauge(f"startup.{name}_seconds", elapsed)
+        app_logger.info(f"⏱️  {name} took {elapsed * 1000:.1f}ms")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifecycle events"""
     root_logger = logging.getLogger()
     root_logger.handlers.clear()
     app_logger.info("🚀 Server starting...")
-    await init_db()
-    await init_redis()
+    with startup_phase("total"):
+        with startup_phase("database"):
+            await init_db()
+        with startup_phase("redis"):
+            await init_redis()
+        with startup_phase("response_cache"):
+            await response_cache.start()
+        await key_ring.start()
     yield
+    await key_ring.stop()
+    await response_cache.stop()
+    password_hasher.shutdown()
+    await redis_client.close()
+    await replicas.dispose()
     app_logger.info("👋 Server stopped...")
 
 
@@ -44,3 +77,19 @@ register_middlewares(app)
 @app.get("/")
 async def root():
     return {"message": "FastAPI Template server is running 🚀"}
+
+
+@app.get("/.well-known/jwks.json")
+async def jwks(response: Response):
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return key_ring.jwks()
+
+
+@app.get(f"{api_version}/metrics", dependencies=[Depends(MetricsTokenBearer())], include_in_schema=False)
+async def get_metrics():
+    if mail_queue.enabled:
+        try:
+            await mail_queue.report()
+        except Exception as e:
+            app_logger.warning(f"Could not read mail queue stats: {e}")
+    return metrics.snapshot()
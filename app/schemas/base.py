@@ -50,6 +50,19 @@ class PaginatedResponseModel(BaseModel, Generic[T]):
     pagination: PaginationModel
 
 
+class CursorPaginationModel(BaseModel):
+    limit: int
+    has_more: bool
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    estimated_total: Optional[int] = None
+
+
+class CursorPaginatedResponseModel(BaseModel, Generic[T]):
+    items: list[T]
+    pagination: CursorPaginationModel
+
+
 class ServerErrorModel(BaseModel, Generic[T]):
     error_code: T
     message: str
@@ -91,6 +104,16 @@ class BaseFilterModel(BaseModel):
     offset: int = Field(default=Config.DEFAULT_PAGE_OFFSET, ge=Config.DEFAULT_PAGE_OFFSET)
 
 
+class CursorFilterModel(BaseModel):
+    q: Optional[str] = Field(default=None)
+    limit: int = Field(
+        default=Config.DEFAULT_PAGE_LIMIT, ge=Config.DEFAULT_PAGE_MIN_LIMIT, le=Config.DEFAULT_PAGE_MAX_LIMIT
+    )
+    cursor: Optional[str] = Field(default=None)
+    sort_order: SortOrderModel = Field(default=SortOrderModel.DESC)
+    include_total: bool = Field(default=False)
+
+
 class RepoFilterResponseModel(BaseModel):
     items: list
     current_page: int
@@ -27,11 +27,16 @@ def get_request_origin() -> str:
     return context.get("origin")
 
 
-def build_serial_no(name: str, id: int):
-    prefix = name.upper().ljust(3, "X")[:3]
-    current_year = str(datetime.now(timezone.utc).year)
+def serial_prefix(name: str) -> str:
+    return name.upper().ljust(3, "X")[:3]
+
+
+def format_serial_no(prefix: str, year: int, number: int) -> str:
+    return f"{prefix}-{year}-{str(number).zfill(4)}"
 
-    return f"{prefix}-{current_year}-{str(id).zfill(4)}"
+
+def build_serial_no(name: str, id: int):
+    return format_serial_no(serial_prefix(name), datetime.now(timezone.utc).year, id)
 
 
 def get_current_and_total_pages(limit: int, total: Optional[int] = None, offset: Optional[int] = None):
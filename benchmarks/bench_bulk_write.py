@@ -0,0 +1,96 @@
+"""Rows/sec writing `rows` rows with ORM add_all, COPY (bulk_insert) and INSERT ... ON CONFLICT (bulk_upsert),
+against the PostgreSQL database in DATABASE_URL.
+
+Writes to a scratch table that is dropped afterwards. The upsert runs twice: into an empty table (all inserts)
+and over the same keys again (all updates).
+
+Usage: python -m benchmarks.bench_bulk_write [rows]
+"""
+
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import text
+from sqlmodel import Field, SQLModel
+
+from app.database.base import AsyncSessionMaker, async_engine
+from app.database.bulk import bulk_insert, bulk_upsert
+
+TABLE_NAME = "bench_bulk_signup"
+
+
+class BenchBulkSignup(SQLModel, table=True):
+    __tablename__ = TABLE_NAME
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    email: str = Field(unique=True)
+    ref: uuid.UUID
+    created_at: datetime
+
+
+TABLE = BenchBulkSignup.__table__
+
+
+async def signups(rows: int) -> AsyncIterator[dict]:
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    for n in range(rows):
+        yield {"email": f"user{n}@example.com", "ref": uuid.uuid4(), "created_at": now}
+
+
+async def reset():
+    async with async_engine.begin() as connection:
+        await connection.run_sync(TABLE.drop, checkfirst=True)
+        await connection.run_sync(TABLE.create)
+
+
+async def orm(rows: int):
+    async with AsyncSessionMaker() as session:
+        session.add_all([BenchBulkSignup(**row) async for row in signups(rows)])
+        await session.commit()
+
+
+async def copy(rows: int):
+    async with AsyncSessionMaker() as session:
+        await bulk_insert(session, BenchBulkSignup, signups(rows))
+        await session.commit()
+
+
+async def upsert(rows: int):
+    async with AsyncSessionMaker() as session:
+        result = await bulk_upsert(session, BenchBulkSignup, signups(rows), conflict_columns=["email"])
+        await session.commit()
+    return result
+
+
+async def timed(label: str, rows: int, write, fresh: bool = True):
+    if fresh:
+        await reset()
+    start = time.perf_counter()
+    result = await write(rows)
+    elapsed = time.perf_counter() - start
+    async with async_engine.connect() as connection:
+        stored = (await connection.execute(text(f"SELECT count(*) FROM {TABLE_NAME}"))).scalar_one()
+    detail = f"  {result}" if result is not None else ""
+    print(f"{label:<20} {rows / elapsed:>12.0f} {stored:>10}{detail}")
+
+
+async def main(rows: int):
+    try:
+        print(f"rows: {rows}")
+        print(f"{'mode':<20} {'rows/sec':>12} {'stored':>10}")
+        await timed("orm add_all", rows, orm)
+        await timed("copy", rows, copy)
+        await timed("upsert (inserts)", rows, upsert)
+        await timed("upsert (updates)", rows, upsert, fresh=False)
+    finally:
+        async with async_engine.begin() as connection:
+            await connection.run_sync(TABLE.drop, checkfirst=True)
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000))
@@ -0,0 +1,58 @@
+"""Encode/decode time and Authorization header size for full and slim access-token claims.
+
+Usage: python -m benchmarks.bench_claims_profile [iterations]
+"""
+
+import sys
+import time
+from uuid import uuid4
+
+import jwt
+
+from app.core.authentication import Authentication
+from app.core.config import Config
+from app.schemas.auth import TokenUserModel
+
+USER = TokenUserModel(
+    id=1,
+    uid=uuid4(),
+    first_name="John",
+    last_name="Doe",
+    email="john.doe@example.com",
+    gender="male",
+    phone_number="+2348000000000",
+    is_email_verified=True,
+    is_number_verified=False,
+)
+
+
+def run(claims: dict, iterations: int) -> dict:
+    exp = int(time.time()) + Authentication.ACCESS_TOKEN_EXPIRY_IN_SECONDS
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        token, _ = Authentication._encode_token({"user": claims, "exp": exp}, refresh=False)
+    encode = (time.perf_counter() - start) / iterations
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        jwt.decode(jwt=token, key=Config.JWT_SECRET, algorithms=[Config.JWT_ALGORITHM])
+    decode = (time.perf_counter() - start) / iterations
+
+    return {"encode": encode, "decode": decode, "header": len(f"Authorization: Bearer {token}")}
+
+
+def main(iterations: int):
+    profiles = {
+        "full": USER.model_dump(mode="json"),
+        "slim": USER.model_dump(mode="json", include=Authentication.SLIM_USER_CLAIMS),
+    }
+    print(f"iterations: {iterations}")
+    print(f"{'profile':<8} {'encode us':>10} {'decode us':>10} {'header B':>9}")
+    for name, claims in profiles.items():
+        row = run(claims, iterations)
+        print(f"{name:<8} {row['encode'] * 1e6:>10.2f} {row['decode'] * 1e6:>10.2f} {row['header']:>9}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
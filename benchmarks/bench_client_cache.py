@@ -0,0 +1,76 @@
+"""Redis commands and read throughput with and without the client-side cache, against a local redis-server.
+
+Reads follow a skewed (hot-key) distribution over `keys` string keys; every
+`write_every`-th operation rewrites one of them so invalidations are exercised.
+
+Usage: python -m benchmarks.bench_client_cache [operations] [keys] [write_every]
+"""
+
+import asyncio
+import random
+import sys
+import time
+
+import redis.asyncio as aioredis
+
+from app.core.metrics import metrics
+from app.database.client_cache import TrackedKeyCache
+from app.database.redis_pool import create_connection_pool
+
+
+async def commands_processed(client: aioredis.Redis) -> int:
+    return (await client.info("stats"))["total_commands_processed"]
+
+
+async def run(client: aioredis.Redis, cache, operations: int, keys: int, write_every: int):
+    rng = random.Random(42)
+    names = [f"bench:csc:{n}" for n in range(keys)]
+    await client.mset({name: "x" * 64 for name in names})
+
+    before = await commands_processed(client)
+    start = time.perf_counter()
+    for i in range(operations):
+        name = names[min(int(rng.expovariate(10 / keys)), keys - 1)]
+        if write_every and i % write_every == 0:
+            await client.set(name, str(i))
+        elif cache is not None:
+            await cache.get(name)
+        else:
+            await client.get(name)
+    elapsed = time.perf_counter() - start
+    commands = await commands_processed(client) - before - 1  # minus this INFO
+
+    await client.delete(*names)
+    return operations / elapsed, commands
+
+
+async def main(operations: int, keys: int, write_every: int):
+    client = aioredis.Redis.from_pool(create_connection_pool())
+    cache = TrackedKeyCache(maxsize=keys, enabled=True)
+    await cache.start()
+    try:
+        print(f"operations: {operations}, keys: {keys}, one write every {write_every} operations")
+        print(f"{'mode':<12} {'ops/sec':>10} {'redis cmds':>11} {'cmds/op':>8}")
+        for mode in ("direct", "client-side"):
+            metrics.reset()
+            ops, commands = await run(client, cache if mode == "client-side" else None, operations, keys, write_every)
+            print(f"{mode:<12} {ops:>10.0f} {commands:>11} {commands / operations:>8.3f}")
+
+        hits, misses = metrics.counter("redis_client_cache.hit"), metrics.counter("redis_client_cache.miss")
+        print(
+            f"local hit ratio: {hits / max(1, hits + misses):.1%}, "
+            f"invalidations: {metrics.counter('redis_client_cache.invalidated')}"
+        )
+    finally:
+        await cache.stop()
+        await client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 100000,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 1000,
+            int(sys.argv[3]) if len(sys.argv) > 3 else 100,
+        )
+    )
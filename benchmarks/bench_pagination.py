@@ -0,0 +1,108 @@
+"""Latency of a page at increasing depth with offset pagination (OFFSET + COUNT(*)) and keyset cursors
+(+ planner estimate), against the PostgreSQL database in DATABASE_URL.
+
+Seeds a scratch table of `rows` rows indexed on (created_at, uid) and drops it afterwards.
+
+Usage: python -m benchmarks.bench_pagination [rows] [limit] [repeats]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Index, func, text
+from sqlmodel import Field, SQLModel, select
+
+from app.database.base import AsyncSessionMaker, async_engine
+from app.database.pagination import encode_cursor, estimate_total, paginate_by_cursor
+from app.schemas.base import SortOrderModel
+
+
+class BenchPaginationItem(SQLModel, table=True):
+    __tablename__ = "bench_pagination_item"
+    __table_args__ = (Index("ix_bench_pagination_item_created_at_uid", "created_at", "uid"),)
+
+    uid: uuid.UUID = Field(primary_key=True)
+    created_at: datetime
+    name: str
+
+
+SORT_KEYS = (BenchPaginationItem.created_at, BenchPaginationItem.uid)
+TABLE = BenchPaginationItem.__table__
+
+
+async def seed(rows: int):
+    async with async_engine.begin() as connection:
+        await connection.run_sync(TABLE.drop, checkfirst=True)
+        await connection.run_sync(TABLE.create)
+        await connection.execute(
+            text(
+                "INSERT INTO bench_pagination_item (uid, created_at, name) "
+                "SELECT gen_random_uuid(), now() - n * interval '1 second', 'item ' || n "
+                "FROM generate_series(1, :rows) AS n"
+            ),
+            {"rows": rows},
+        )
+        await connection.execute(text("ANALYZE bench_pagination_item"))
+
+
+async def timed(fn, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+async def offset_page(session, offset: int, limit: int):
+    statement = select(BenchPaginationItem).order_by(*(key.desc() for key in SORT_KEYS))
+    await session.exec(statement.offset(offset).limit(limit))
+    await session.exec(select(func.count()).select_from(TABLE))
+
+
+async def main(rows: int, limit: int, repeats: int):
+    await seed(rows)
+    try:
+        async with AsyncSessionMaker() as session:
+            print(f"rows: {rows}, limit: {limit}, median of {repeats} runs")
+            print(f"{'depth':>10} {'offset+count ms':>16} {'keyset+estimate ms':>19}")
+            depth = limit
+            while depth < rows:
+                # The cursor a client would hold after paging down to `depth`.
+                anchor = (
+                    await session.exec(
+                        select(*SORT_KEYS).order_by(*(key.desc() for key in SORT_KEYS)).offset(depth - 1).limit(1)
+                    )
+                ).one()
+                cursor = encode_cursor(list(anchor), "next", SortOrderModel.DESC)
+
+                offset_ms = await timed(lambda: offset_page(session, depth, limit), repeats)
+                keyset_ms = await timed(
+                    lambda: paginate_by_cursor(
+                        session, select(BenchPaginationItem), SORT_KEYS, limit, cursor, include_total=True
+                    ),
+                    repeats,
+                )
+                print(f"{depth:>10} {offset_ms:>16.2f} {keyset_ms:>19.2f}")
+                depth *= 10
+
+            estimate = await estimate_total(session, select(BenchPaginationItem))
+            print(f"planner estimate of the row count: {estimate} (actual {rows})")
+    finally:
+        async with async_engine.begin() as connection:
+            await connection.run_sync(TABLE.drop, checkfirst=True)
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 1000000,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 30,
+            int(sys.argv[3]) if len(sys.argv) > 3 else 5,
+        )
+    )
@@ -0,0 +1,67 @@
+"""Bytes of Redis memory per refresh session for the legacy and compact key schemas.
+
+Writes N sessions (plus a blocklist entry each) for one throwaway user with each
+schema, sums `MEMORY USAGE` over the keys it created and deletes them again.
+
+Usage: python -m benchmarks.bench_redis_memory [sessions]
+"""
+
+import asyncio
+import sys
+from uuid import uuid4
+
+from app.core.authentication import Authentication
+from app.database.redis import KeySchema, init_redis, redis_client
+
+
+async def memory_usage(names: list) -> int:
+    client = redis_client.client
+    async with client.pipeline(transaction=False) as pipe:
+        for name in names:
+            pipe.memory_usage(name, samples=0)
+        usage = await pipe.execute()
+    await client.delete(*names)
+    return sum(value or 0 for value in usage)
+
+
+async def measure(schema: KeySchema, sessions: int, token: str) -> dict:
+    redis_client.keys = schema
+    uid = str(uuid4())
+    jtis = [str(uuid4()) for _ in range(sessions)]
+
+    for jti in jtis:
+        await redis_client.add_session(
+            uid=uid, jti=jti, token=token, expiry=Authentication.REFRESH_TOKEN_EXPIRY_IN_SECONDS
+        )
+        await redis_client.add_to_blocklist(jti, expiry=Authentication.ACCESS_TOKEN_EXPIRY_IN_SECONDS)
+
+    index_bytes = await memory_usage([schema.session_index(uid)])
+    session_bytes = await memory_usage([schema.session(jti) for jti in jtis])
+    blocked_bytes = await memory_usage([schema.blocked(jti) for jti in jtis])
+    return {
+        "session": session_bytes / sessions,
+        "index": index_bytes / sessions,
+        "blocked": blocked_bytes / sessions,
+        "total": (index_bytes + session_bytes + blocked_bytes) / sessions,
+    }
+
+
+async def main(sessions: int):
+    if not await init_redis():
+        sys.exit("Redis is not reachable")
+
+    token, _ = Authentication._encode_token({"user": {"uid": str(uuid4()), "id": 1}, "exp": 2**31 - 1}, refresh=True)
+    original = redis_client.keys
+    try:
+        print(f"sessions: {sessions}, refresh token length: {len(token)} bytes")
+        print(f"{'schema':<8} {'session':>9} {'index':>9} {'blocked':>9} {'total':>9}  (bytes/session)")
+        for name, schema in (("legacy", KeySchema(compact=False)), ("compact", KeySchema(compact=True))):
+            row = await measure(schema, sessions, token)
+            print(f"{name:<8} {row['session']:>9.1f} {row['index']:>9.1f} {row['blocked']:>9.1f} {row['total']:>9.1f}")
+    finally:
+        redis_client.keys = original
+        await redis_client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000))
@@ -0,0 +1,65 @@
+"""Redis throughput for each parser / protocol / transport combination against a local redis-server.
+
+Start a server that listens on both TCP and a unix socket, e.g.
+    redis-server --port 6379 --unixsocket /tmp/redis.sock --unixsocketperm 700
+
+Usage: python -m benchmarks.bench_redis_pool [operations] [concurrency] [unix_socket_path]
+"""
+
+import asyncio
+import importlib.util
+import sys
+import time
+
+import redis.asyncio as aioredis
+
+from app.core.metrics import metrics
+from app.database.redis_pool import create_connection_pool
+
+
+async def run(parser: str, protocol: int, unix_socket_path, operations: int, concurrency: int) -> float:
+    client = aioredis.Redis.from_pool(
+        create_connection_pool(parser=parser, protocol=protocol, unix_socket_path=unix_socket_path, url=None)
+    )
+    per_worker = operations // concurrency
+
+    async def worker(n: int):
+        key = f"bench:pool:{n}"
+        for i in range(per_worker // 2):
+            await client.set(key, i)
+            await client.get(key)
+
+    try:
+        await client.ping()
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        await client.delete(*(f"bench:pool:{n}" for n in range(concurrency)))
+    finally:
+        await client.aclose()
+    return per_worker * concurrency / elapsed
+
+
+async def main(operations: int, concurrency: int, unix_socket_path):
+    parsers = ["python"] + (["hiredis"] if importlib.util.find_spec("hiredis") else [])
+    transports = [("tcp", None)] + ([("unix", unix_socket_path)] if unix_socket_path else [])
+
+    print(f"operations: {operations}, concurrency: {concurrency}")
+    print(f"{'parser':<8} {'resp':>4} {'transport':<9} {'ops/sec':>10} {'pool waits':>10}")
+    for parser in parsers:
+        for protocol in (2, 3):
+            for transport, path in transports:
+                metrics.reset()
+                ops = await run(parser, protocol, path, operations, concurrency)
+                waits = metrics.counter("redis_pool.waits")
+                print(f"{parser:<8} {protocol:>4} {transport:<9} {ops:>10.0f} {waits:>10}")
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 100000,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 64,
+            sys.argv[3] if len(sys.argv) > 3 else None,
+        )
+    )
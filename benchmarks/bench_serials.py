@@ -0,0 +1,76 @@
+"""Serial numbers issued per second for several block sizes, against a local redis-server (or the PostgreSQL
+database in DATABASE_URL with `postgres`).
+
+A block size of 1 is a round trip per serial, as without block allocation.
+
+Usage: python -m benchmarks.bench_serials [serials] [concurrency] [redis|postgres]
+"""
+
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+
+from app.core.serials import PostgresSequences, SerialAllocator, reserve_from_redis
+from app.database.base import async_engine
+from app.database.redis import redis_client
+
+
+async def run(allocator: SerialAllocator, prefix: str, serials: int, concurrency: int) -> float:
+    year = datetime.now(timezone.utc).year
+    issued = []
+
+    async def worker():
+        for _ in range(serials // concurrency):
+            issued.append(await allocator.next_number(prefix, year))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    assert len(set(issued)) == len(issued), "duplicate serial numbers"
+    return len(issued) / elapsed
+
+
+async def main(serials: int, concurrency: int, backend: str):
+    if backend == "postgres":
+        reserve = PostgresSequences()
+    else:
+        await redis_client.init()
+        reserve = reserve_from_redis
+
+    block_sizes = (1, 10, 100, 1000)
+    year = datetime.now(timezone.utc).year
+    # A prefix per run and block size, so no run continues another's counters and a PostgreSQL
+    # sequence is always created with this block size as its step.
+    run_id = uuid.uuid4().hex[:8].upper()
+    prefixes = {block_size: f"B{block_size}X{run_id}" for block_size in block_sizes}
+    try:
+        print(f"serials: {serials}, concurrency: {concurrency}, backend: {backend}")
+        print(f"{'block':>6} {'serials/sec':>12}")
+        for block_size in block_sizes:
+            allocator = SerialAllocator(block_size=block_size, reserve=reserve)
+            per_second = await run(allocator, prefixes[block_size], serials, concurrency)
+            print(f"{block_size:>6} {per_second:>12.0f}")
+    finally:
+        if backend == "postgres":
+            async with async_engine.begin() as conn:
+                for prefix in prefixes.values():
+                    await conn.execute(text(f"DROP SEQUENCE IF EXISTS {PostgresSequences._name(prefix, year)}"))
+        elif redis_client.client is not None:
+            for prefix in prefixes.values():
+                await redis_client.client.delete(redis_client.keys.serial(prefix, year))
+        await redis_client.close()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 20000,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 16,
+            sys.argv[3] if len(sys.argv) > 3 else "redis",
+        )
+    )
@@ -0,0 +1,72 @@
+"""Cold start of `workers` processes starting together, for each DB_STARTUP_MODE, against the PostgreSQL
+database in DATABASE_URL and the configured Redis.
+
+Each worker is a fresh interpreter that imports app.main and runs the application's start-up; the table shows
+the wall time until all of them are ready and each phase averaged over the workers. "check_migrations" needs the
+database migrated to the Alembic head.
+
+Usage: python -m benchmarks.bench_startup [workers] [modes, comma separated]
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+MODES = ("create_all", "check_migrations", "lazy")
+
+WORKER = """
+import asyncio, json, time
+start = time.perf_counter()
+from app.main import app, lifespan
+from app.core.metrics import metrics
+imported = time.perf_counter() - start
+
+async def main():
+    async with lifespan(app):
+        gauges = metrics.snapshot()["gauges"]
+        phases = {name[len("startup."):-len("_seconds")]: value for name, value in gauges.items()
+                  if name.startswith("startup.")}
+        print(json.dumps({"import": imported, **phases}))
+
+asyncio.run(main())
+"""
+
+
+async def start_worker(mode: str) -> dict:
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-c",
+        WORKER,
+        env={**os.environ, "DB_STARTUP_MODE": mode},
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    stdout, _ = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"worker failed in {mode} mode (exit {process.returncode})")
+    # Application logs share stdout with the timings line.
+    return next(json.loads(line) for line in stdout.decode().splitlines() if line.startswith("{"))
+
+
+async def main(workers: int, modes):
+    phases = ("import", "database", "redis", "response_cache", "total")
+    print(f"workers: {workers}")
+    print(f"{'mode':<18} {'wall ms':>9} " + " ".join(f"{phase + ' ms':>17}" for phase in phases))
+    for mode in modes:
+        start = time.perf_counter()
+        results = await asyncio.gather(*(start_worker(mode) for _ in range(workers)))
+        wall = time.perf_counter() - start
+        averages = [statistics.mean(result.get(phase, 0.0) for result in results) * 1000 for phase in phases]
+        print(f"{mode:<18} {wall * 1000:>9.0f} " + " ".join(f"{value:>17.1f}" for value in averages))
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 8,
+            sys.argv[2].split(",") if len(sys.argv) > 2 else MODES,
+        )
+    )
@@ -0,0 +1,48 @@
+"""Per-request cost of Authentication.decode_token with the verified-token cache on and off.
+
+Usage: python -m benchmarks.bench_token_cache [iterations]
+"""
+
+import asyncio
+import sys
+import time
+from uuid import uuid4
+
+from app.core.authentication import Authentication
+from app.core.token_cache import token_cache
+from app.schemas.auth import TokenUserModel
+
+USER = TokenUserModel(
+    id=1,
+    uid=uuid4(),
+    first_name="John",
+    last_name="Doe",
+    email="john@example.com",
+    gender="male",
+    phone_number="+2348000000000",
+    is_email_verified=True,
+    is_number_verified=False,
+)
+
+
+async def run(token: str, iterations: int, enabled: bool) -> float:
+    token_cache.enabled = enabled
+    token_cache.clear()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await Authentication.decode_token(token)
+    return (time.perf_counter() - start) / iterations
+
+
+async def main(iterations: int):
+    token = await Authentication.create_token(user_data=USER)
+    off = await run(token, iterations, enabled=False)
+    on = await run(token, iterations, enabled=True)
+    print(f"iterations:  {iterations}")
+    print(f"cache off:   {off * 1e6:8.2f} us/request")
+    print(f"cache on:    {on * 1e6:8.2f} us/request")
+    print(f"speedup:     {off / on:8.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
@@ -0,0 +1,75 @@
+"""Insert throughput and primary key index size with UUIDv4 versus UUIDv7 keys, against the PostgreSQL database
+in DATABASE_URL.
+
+Rows go in `batch` at a time through single multi-row INSERTs, the way an application writes, into a scratch
+table per key version that is dropped afterwards. Random v4 keys land all over the index; v7 keys append to it.
+
+Usage: python -m benchmarks.bench_uuid7 [rows] [batch]
+"""
+
+import asyncio
+import sys
+import time
+import uuid
+
+from sqlalchemy import Column, MetaData, String, Table, Uuid, insert, text
+
+from app.database.base import async_engine
+from app.utils.uuid7 import uuid7
+
+metadata = MetaData()
+TABLES = {
+    version: Table(
+        f"bench_uuid_{version}",
+        metadata,
+        Column("uid", Uuid, primary_key=True),
+        Column("payload", String, nullable=False),
+    )
+    for version in ("v4", "v7")
+}
+GENERATORS = {"v4": uuid.uuid4, "v7": uuid7}
+
+
+async def run(version: str, rows: int, batch: int):
+    table = TABLES[version]
+    generate = GENERATORS[version]
+    async with async_engine.begin() as connection:
+        await connection.run_sync(table.drop, checkfirst=True)
+        await connection.run_sync(table.create)
+
+    start = time.perf_counter()
+    for offset in range(0, rows, batch):
+        values = [{"uid": generate(), "payload": "x" * 32} for _ in range(min(batch, rows - offset))]
+        async with async_engine.begin() as connection:
+            await connection.execute(insert(table).values(values))
+    elapsed = time.perf_counter() - start
+
+    async with async_engine.connect() as connection:
+        index_size = (
+            await connection.execute(
+                text("SELECT pg_relation_size(CAST(:index AS regclass))"), {"index": f"{table.name}_pkey"}
+            )
+        ).scalar_one()
+    return rows / elapsed, index_size
+
+
+async def main(rows: int, batch: int):
+    try:
+        print(f"rows: {rows}, batch: {batch}")
+        print(f"{'key':<4} {'rows/sec':>10} {'index MB':>9}")
+        for version in ("v4", "v7"):
+            per_second, index_size = await run(version, rows, batch)
+            print(f"{version:<4} {per_second:>10.0f} {index_size / 2**20:>9.1f}")
+    finally:
+        async with async_engine.begin() as connection:
+            await connection.run_sync(metadata.drop_all, checkfirst=True)
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 1000000,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 500,
+        )
+    )
@@ -0,0 +1,143 @@
+"""Run the session/blocklist flow against a local multi-process Redis Sentinel or Cluster.
+
+Needs redis-server and redis-cli on PATH. Every node runs in its own process
+under a temporary directory and is stopped on exit.
+
+Usage: python -m benchmarks.redis_topology sentinel|cluster [operations]
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+SENTINEL_PORTS = [26379, 26380, 26381]
+PRIMARY_PORT, REPLICA_PORT = 6390, 6391
+CLUSTER_PORTS = list(range(7000, 7006))
+
+
+def spawn(workdir: str, name: str, args: list) -> subprocess.Popen:
+    path = os.path.join(workdir, name)
+    os.makedirs(path, exist_ok=True)
+    return subprocess.Popen(
+        ["redis-server", *args, "--dir", path, "--save", "", "--appendonly", "no"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.STDOUT,
+    )
+
+
+def wait_for(port: int, timeout: float = 10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        ping = subprocess.run(["redis-cli", "-p", str(port), "ping"], capture_output=True, text=True)
+        if ping.stdout.strip() == "PONG":
+            return
+        time.sleep(0.1)
+    raise RuntimeError(f"redis on port {port} did not start")
+
+
+def start_sentinel(workdir: str) -> list:
+    processes = [
+        spawn(workdir, "primary", ["--port", str(PRIMARY_PORT)]),
+        spawn(workdir, "replica", ["--port", str(REPLICA_PORT), "--replicaof", "127.0.0.1", str(PRIMARY_PORT)]),
+    ]
+    wait_for(PRIMARY_PORT)
+    wait_for(REPLICA_PORT)
+    for port in SENTINEL_PORTS:
+        conf = os.path.join(workdir, f"sentinel-{port}.conf")
+        with open(conf, "w") as f:
+            f.write(f"port {port}\nsentinel monitor mymaster 127.0.0.1 {PRIMARY_PORT} 2\n")
+        processes.append(spawn(workdir, f"sentinel-{port}", [conf, "--sentinel"]))
+    for port in SENTINEL_PORTS:
+        wait_for(port)
+
+    os.environ.update(
+        REDIS_MODE="sentinel",
+        REDIS_SENTINELS=json.dumps([f"127.0.0.1:{port}" for port in SENTINEL_PORTS]),
+        REDIS_SENTINEL_MASTER="mymaster",
+    )
+    return processes
+
+
+def start_cluster(workdir: str) -> list:
+    processes = [
+        spawn(workdir, f"node-{port}", ["--port", str(port), "--cluster-enabled", "yes"]) for port in CLUSTER_PORTS
+    ]
+    for port in CLUSTER_PORTS:
+        wait_for(port)
+    subprocess.run(
+        ["redis-cli", "--cluster", "create", *(f"127.0.0.1:{port}" for port in CLUSTER_PORTS)]
+        + ["--cluster-replicas", "1", "--cluster-yes"],
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    time.sleep(2)  # let replicas finish their first sync
+
+    os.environ.update(
+        REDIS_MODE="cluster",
+        REDIS_CLUSTER_NODES=json.dumps([f"127.0.0.1:{port}" for port in CLUSTER_PORTS]),
+    )
+    return processes
+
+
+async def exercise(operations: int):
+    # Imported late so Config picks up the topology set in the environment above.
+    from app.database.redis import RotationResult, init_redis, redis_client
+
+    await init_redis()
+    try:
+        uid = str(uuid.uuid4())
+        jti, token = str(uuid.uuid4()), "token-0"
+        assert await redis_client.add_session(uid, jti, token, 600)
+
+        start = time.perf_counter()
+        for i in range(1, operations + 1):
+            new_jti, new_token = str(uuid.uuid4()), f"token-{i}"
+            result = await redis_client.rotate_session(uid, jti, token, int(time.time()) + 600, new_jti, new_token, 600)
+            assert result == RotationResult.ROTATED, result
+            jti, token = new_jti, new_token
+        rotate_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        blocked = await asyncio.gather(*(redis_client.in_blocklist(str(uuid.uuid4())) for _ in range(operations)))
+        lookup_elapsed = time.perf_counter() - start
+        assert not any(blocked)
+
+        assert await redis_client.revoke_all_sessions(uid) == 1
+        await asyncio.sleep(0.5)  # replicas catch up asynchronously
+        assert await redis_client.in_blocklist(jti)
+        assert await redis_client.list_sessions(uid) == {}
+    finally:
+        await redis_client.close()
+
+    print(f"rotations:         {operations / rotate_elapsed:>10.0f} /sec")
+    print(f"blocklist lookups: {operations / lookup_elapsed:>10.0f} /sec (replica reads)")
+
+
+def main(mode: str, operations: int):
+    if not shutil.which("redis-server") or not shutil.which("redis-cli"):
+        sys.exit("redis-server and redis-cli are required")
+
+    workdir = tempfile.mkdtemp(prefix=f"redis-{mode}-")
+    processes = start_sentinel(workdir) if mode == "sentinel" else start_cluster(workdir)
+    try:
+        time.sleep(1)
+        asyncio.run(exercise(operations))
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main(
+        sys.argv[1] if len(sys.argv) > 1 else "cluster",
+        int(sys.argv[2]) if len(sys.argv) > 2 else 1000,
+    )
@@ -0,0 +1,61 @@
+import asyncio
+from uuid import UUID
+
+import pytest
+
+from app.core.authentication import Authentication
+from app.core.config import Config
+from app.core.exceptions import RefreshTokenReused, SessionStoreUnavailable
+from app.database.redis import redis_client
+from app.schemas.auth import TokenUserModel
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def user():
+    return TokenUserModel(
+        id=1,
+        uid=UUID("0190c6c2-79a4-7cc6-8f3a-2f7a3b1c9d10"),
+        first_name="Ada",
+        last_name="Lovelace",
+        email="ada@example.com",
+        gender="female",
+        phone_number="+2348000000000",
+        is_email_verified=True,
+        is_number_verified=False,
+    )
+
+
+async def test_concurrent_refreshes_share_the_successor(fake_redis, user):
+    token = await Authentication.create_token(user, refresh=True)
+
+    first, second = await asyncio.gather(
+        Authentication.rotate_refresh_token(token), Authentication.rotate_refresh_token(token)
+    )
+
+    assert first == second != token
+    assert await redis_client.list_sessions(user.uid) != {}
+    assert await Authentication.rotate_refresh_token(first) != first
+
+
+async def test_reuse_after_the_grace_period_revokes_every_session(fake_redis, user, monkeypatch):
+    monkeypatch.setattr(Config, "REFRESH_TOKEN_REUSE_GRACE_SECONDS", 0)
+    token = await Authentication.create_token(user, refresh=True)
+    await Authentication.rotate_refresh_token(token)
+
+    with pytest.raises(RefreshTokenReused):
+        await Authentication.rotate_refresh_token(token)
+    assert await redis_client.list_sessions(user.uid) == {}
+
+
+async def test_no_refresh_token_without_a_stored_session(fake_redis, user, monkeypatch):
+    monkeypatch.setattr(redis_client, "_client", None)
+    with pytest.raises(SessionStoreUnavailable):
+        await Authentication.create_token(user, refresh=True)
+
+
+async def test_refresh_token_carries_only_the_slim_claims(fake_redis, user):
+    token = await Authentication.create_token(user, refresh=True)
+    payload = await Authentication.decode_token(token)
+    assert payload["user"] == {"id": 1, "uid": str(user.uid)}
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from app.database.redis import BlocklistFilter, KeySchema
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def blocklist():
+    blocklist = BlocklistFilter()
+    yield blocklist
+    await blocklist.stop()
+
+
+async def test_load_reads_every_blocked_key(blocklist, fake_redis):
+    keys = KeySchema()
+    # More than one SCAN chunk, so the chunked load is exercised across a boundary.
+    async with fake_redis.pipeline(transaction=False) as pipe:
+        for index in range(2500):
+            pipe.set(keys.blocked(f"jti-{index}"), 1, ex=60)
+        await pipe.execute()
+
+    await blocklist.start(fake_redis, keys)
+
+    assert blocklist.synced
+    assert all(blocklist.contains(f"jti-{index}") for index in range(2500))
+    assert not blocklist.contains("jti-unknown")
+
+
+async def test_idle_subscription_is_not_reloaded(blocklist, fake_redis, monkeypatch):
+    loads = []
+    load = blocklist._load
+
+    async def counting_load(client, keys):
+        loads.append(1)
+        await load(client, keys)
+
+    monkeypatch.setattr(blocklist, "_load", counting_load)
+    await blocklist.start(fake_redis, KeySchema())
+
+    # The old blocking listen() dropped out of an idle subscription and reloaded the whole set.
+    await asyncio.sleep(0.2)
+    await fake_redis.publish(BlocklistFilter.CHANNEL, "jti-late:60")
+    for _ in range(100):
+        if blocklist.contains("jti-late"):
+            break
+        await asyncio.sleep(0.01)
+
+    assert blocklist.contains("jti-late")
+    assert len(loads) == 1
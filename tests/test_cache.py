@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.cache import ResponseCache
+from app.database.redis import redis_client
+
+pytestmark = pytest.mark.anyio
+
+
+class Profile(BaseModel):
+    name: str
+
+
+@pytest.fixture
+def cache(fake_redis):
+    return ResponseCache(l1_size=100, l1_ttl=60)
+
+
+async def test_compute_overtaken_by_invalidate_is_not_stored(cache, fake_redis):
+    started, release = asyncio.Event(), asyncio.Event()
+
+    @cache.cached(ttl=60, tags=["user:{uid}"])
+    async def get_profile(uid: str) -> Profile:
+        started.set()
+        await release.wait()
+        return Profile(name="old")
+
+    pending = asyncio.create_task(get_profile("1"))
+    await started.wait()
+    await cache.invalidate("user:1")
+    release.set()
+
+    assert (await pending).name == "old"
+    assert len(cache.local) == 0
+    assert await fake_redis.keys(redis_client.keys.cache("*")) == []
+
+
+async def test_compute_without_invalidation_is_stored(cache, fake_redis):
+    @cache.cached(ttl=60, tags=["user:{uid}"])
+    async def get_profile(uid: str) -> Profile:
+        return Profile(name="current")
+
+    await get_profile("1")
+    assert len(cache.local) == 1
+    assert len(await fake_redis.keys(redis_client.keys.cache("*"))) == 1
+
+
+async def test_shared_compute_runs_on_its_own_session(cache):
+    seen = []
+
+    @cache.cached(ttl=60)
+    async def load(session: AsyncSession) -> Profile:
+        seen.append(session)
+        return Profile(name="x")
+
+    callers_session = AsyncSession()
+    await load(callers_session)
+    assert len(seen) == 1 and seen[0] is not callers_session
@@ -0,0 +1,79 @@
+import pytest
+from redis.exceptions import ConnectionError
+
+from app.database.circuit_breaker import CircuitBreaker, CircuitOpen, CircuitState
+from app.database.redis import redis_client
+from app.database.redis_pool import PoolExhausted
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker(name="test_redis", failure_threshold=3, reset_timeout=60)
+    monkeypatch.setattr(redis_client, "breaker", breaker)
+    return breaker
+
+
+@pytest.fixture
+def fail_with(fake_redis, monkeypatch):
+    """Make every listed command on the fake client raise `error`, counting the attempts."""
+    calls = []
+
+    def install(error, *commands):
+        async def failing(*args, **kwargs):
+            calls.append(args)
+            raise error
+
+        for command in commands:
+            monkeypatch.setattr(fake_redis, command, failing)
+        return calls
+
+    return install
+
+
+async def test_breaker_opens_after_the_threshold(breaker, fail_with):
+    calls = fail_with(ConnectionError("connection refused"), "set")
+
+    for _ in range(3):
+        assert await redis_client.pin_primary("u1", 60) is False
+    assert breaker.state == CircuitState.OPEN
+
+    # Open: the fallback comes back without touching Redis.
+    assert await redis_client.pin_primary("u1", 60) is False
+    assert len(calls) == 3
+
+
+async def test_fail_open_ops_return_the_fallback(breaker, fail_with):
+    fail_with(ConnectionError("connection refused"), "exists")
+    assert await redis_client.primary_pinned("u1") is False
+    assert breaker.state == CircuitState.CLOSED
+
+
+async def test_fail_closed_ops_reraise(breaker, fail_with):
+    fail_with(ConnectionError("connection refused"), "evalsha")
+
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            await redis_client.rate_limit("login:u1", limit=5, period=60)
+    with pytest.raises(CircuitOpen):
+        await redis_client.rate_limit("login:u1", limit=5, period=60)
+
+
+async def test_pool_exhaustion_does_not_count_as_a_failure(breaker, fail_with):
+    calls = fail_with(PoolExhausted("no connection available"), "set")
+
+    for _ in range(5):
+        assert await redis_client.pin_primary("u1", 60) is False
+    assert breaker.state == CircuitState.CLOSED
+    assert len(calls) == 5
+
+
+async def test_successful_trial_closes_the_circuit(breaker, fake_redis):
+    breaker.reset_timeout = 0
+    for _ in range(3):
+        breaker.record_failure()
+
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert await redis_client.pin_primary("u1", 60) is True
+    assert breaker.state == CircuitState.CLOSED
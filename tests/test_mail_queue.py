@@ -0,0 +1,56 @@
+import pytest
+
+from app.core.config import Config
+from app.core.mail_queue import MailQueue
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def queue(fake_redis):
+    sent = []
+
+    async def send(**kwargs):
+        sent.append(kwargs)
+
+    queue = MailQueue(enabled=True)
+    queue.register("test", send)
+    queue.sent = sent
+    return queue
+
+
+async def test_undelivered_jobs_are_never_trimmed(queue, fake_redis):
+    await queue.ensure_group()
+    for i in range(50):
+        await queue.enqueue("test", to=f"user{i}@example.com")
+    await queue._trim_acknowledged()
+    assert await fake_redis.xlen(queue.stream) == 50
+    assert queue.sent == []
+
+
+async def test_acknowledged_jobs_are_deleted(queue, fake_redis):
+    await queue.ensure_group()
+    await queue.enqueue("test", to="user@example.com")
+    [(_, [(message_id, fields)])] = await fake_redis.xreadgroup(queue.GROUP, queue.consumer, {queue.stream: ">"})
+    await queue._handle(message_id, fields)
+    await queue._trim_acknowledged()
+    assert queue.sent == [{"to": "user@example.com"}]
+    assert await queue.stats() == {"waiting": 0, "in_flight": 0, "retrying": 0, "dead": 0}
+
+
+async def test_job_crashing_its_workers_is_dead_lettered(queue, fake_redis, monkeypatch):
+    monkeypatch.setattr(Config, "MAIL_QUEUE_VISIBILITY_TIMEOUT_SECONDS", 0)
+    monkeypatch.setattr(Config, "MAIL_QUEUE_MAX_ATTEMPTS", 2)
+    await queue.ensure_group()
+    await queue.enqueue("test", to="user@example.com")
+
+    # Delivered, then reclaimed once, and each time the worker died before settling it.
+    await fake_redis.xreadgroup(queue.GROUP, "crashed-worker", {queue.stream: ">"})
+    await queue._reclaim()
+
+    [(message_id, fields, deliveries)] = await queue._reclaim()
+    assert deliveries == 3
+    await queue._handle(message_id, fields, deliveries)
+
+    assert queue.sent == []
+    assert await queue.stats() == {"waiting": 0, "in_flight": 0, "retrying": 0, "dead": 1}
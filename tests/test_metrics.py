@@ -0,0 +1,19 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import Config
+from app.main import api_version, app
+
+client = TestClient(app, base_url="http://localhost")
+
+
+def test_metrics_are_off_without_a_token(monkeypatch):
+    monkeypatch.setattr(Config, "METRICS_TOKEN", None)
+    assert client.get(f"{api_version}/metrics").status_code == 404
+
+
+@pytest.mark.parametrize("authorization, status", [(None, 401), ("Bearer wrong", 401), ("Bearer s3cret", 200)])
+def test_metrics_need_the_token(monkeypatch, authorization, status):
+    monkeypatch.setattr(Config, "METRICS_TOKEN", "s3cret")
+    headers = {"Authorization": authorization} if authorization else {}
+    assert client.get(f"{api_version}/metrics", headers=headers).status_code == status
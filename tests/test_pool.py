@@ -0,0 +1,29 @@
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool, QueuePool
+
+from app.core.metrics import metrics
+from app.database.pool import register_pool_metrics
+
+
+def _connect_twice(poolclass, prefix):
+    # register_pool_metrics only needs `sync_engine`, so a sync SQLite engine stands in for asyncpg.
+    engine = SimpleNamespace(sync_engine=create_engine("sqlite://", poolclass=poolclass))
+    register_pool_metrics(engine, prefix=prefix)
+    for _ in range(2):
+        with engine.sync_engine.connect() as connection:
+            assert connection.execute(text("SELECT 1")).scalar_one() == 1
+    return metrics.snapshot()
+
+
+def test_null_pool_connections_are_counted_without_pool_gauges():
+    snapshot = _connect_twice(NullPool, "test_null_pool")
+    assert snapshot["counters"]["test_null_pool.checkouts"] == 2
+    assert "test_null_pool.in_use" not in snapshot["gauges"]
+
+
+def test_queue_pool_reports_usage():
+    snapshot = _connect_twice(QueuePool, "test_queue_pool")
+    assert snapshot["counters"]["test_queue_pool.checkouts"] == 2
+    assert snapshot["gauges"]["test_queue_pool.in_use"] == 0
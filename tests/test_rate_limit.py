@@ -0,0 +1,54 @@
+import json
+
+import pytest
+from fastapi import Request, Response
+
+from app.core.config import Config
+from app.core.exceptions import TooManyRequests
+from app.core.rate_limit import login_rate_limit
+from app.database.redis import redis_client
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("limit, period", [(5, 60), (7, 60), (3, 10)])
+async def test_limit_applies_in_redis(fake_redis, limit, period):
+    results = [await redis_client.rate_limit(f"test:{limit}:{period}", limit, period) for _ in range(limit + 1)]
+
+    assert [allowed for allowed, *_ in results] == [True] * limit + [False]
+    assert [remaining for _, remaining, *_ in results[:limit]] == list(reversed(range(limit)))
+    retry_after = results[-1][2]
+    assert 0 < retry_after <= period / limit + 0.001
+
+
+def _login_request(email: str, ip: str) -> Request:
+    body = json.dumps({"email": email, "password": "hunter2"}).encode()
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    scope = {"type": "http", "method": "POST", "path": "/login", "headers": [], "client": (ip, 50000)}
+    return Request(scope, receive)
+
+
+async def test_login_is_limited_per_ip_across_emails(fake_redis, monkeypatch):
+    monkeypatch.setattr(Config, "RATE_LIMIT_ENABLED", True)
+    ip_limit = login_rate_limit.limiters[0].limit
+
+    for i in range(ip_limit):
+        await login_rate_limit(_login_request(f"user{i}@example.com", "203.0.113.7"), Response())
+    with pytest.raises(TooManyRequests):
+        await login_rate_limit(_login_request("one-more@example.com", "203.0.113.7"), Response())
+
+    # Other clients are unaffected.
+    await login_rate_limit(_login_request("one-more@example.com", "198.51.100.2"), Response())
+
+
+async def test_login_is_limited_per_email_across_ips(fake_redis, monkeypatch):
+    monkeypatch.setattr(Config, "RATE_LIMIT_ENABLED", True)
+    email_limit = login_rate_limit.limiters[1].limit
+
+    for i in range(email_limit):
+        await login_rate_limit(_login_request("victim@example.com", f"198.51.100.{i}"), Response())
+    with pytest.raises(TooManyRequests):
+        await login_rate_limit(_login_request("victim@example.com", "198.51.100.250"), Response())
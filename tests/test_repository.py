@@ -0,0 +1,142 @@
+import asyncio
+from typing import List, Optional
+from uuid import UUID
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Field, Relationship, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database.base import async_engine
+from app.database.instrumentation import count_queries
+from app.database.models import TableModel
+from app.database.repository import BaseRepository, BatchLoader
+from app.schemas.base import BaseFilterModel
+
+pytestmark = pytest.mark.anyio
+
+
+class RepoTestParent(TableModel, table=True):
+    name: str
+    children: List["RepoTestChild"] = Relationship(back_populates="parent")
+
+
+class RepoTestChild(TableModel, table=True):
+    name: str
+    parent_uid: UUID = Field(foreign_key="repotestparent.uid")
+    parent: Optional[RepoTestParent] = Relationship(back_populates="children")
+
+
+class ParentRepository(BaseRepository[RepoTestParent]):
+    model = RepoTestParent
+    search_fields = ("name",)
+    presets = {"detail": ("children",)}
+
+
+class ChildRepository(BaseRepository[RepoTestChild]):
+    model = RepoTestChild
+
+
+async def test_loads_in_one_pass_are_batched():
+    calls = []
+
+    async def batch_fn(keys):
+        calls.append(keys)
+        return {key: key * 10 for key in keys if key != 3}
+
+    loader = BatchLoader(batch_fn)
+    assert await asyncio.gather(*(loader.load(key) for key in (1, 2, 3, 2))) == [10, 20, None, 20]
+    assert await loader.load(1) == 10
+    assert calls == [[1, 2, 3]]
+
+
+async def test_loaders_sharing_a_lock_never_overlap():
+    lock, running, overlapped = asyncio.Lock(), [0], []
+
+    async def batch_fn(keys):
+        running[0] += 1
+        overlapped.append(running[0] > 1)
+        await asyncio.sleep(0.01)
+        running[0] -= 1
+        return {key: key for key in keys}
+
+    first, second = BatchLoader(batch_fn, lock=lock), BatchLoader(batch_fn, lock=lock)
+    await asyncio.gather(first.load_many(range(5)), second.load_many(range(5)))
+    assert overlapped == [False, False]
+
+
+async def test_get_by_id_for_n_parents_runs_one_query(db_session):
+    async with async_engine.begin() as connection:
+        await connection.run_sync(
+            SQLModel.metadata.create_all, tables=[RepoTestParent.__table__, RepoTestChild.__table__]
+        )
+    try:
+        parents = [RepoTestParent(name=f"parent {i}") for i in range(20)]
+        children = [RepoTestChild(name=f"child {i}", parent_uid=parent.uid) for i, parent in enumerate(parents)]
+        db_session.add_all(parents)
+        db_session.add_all(children)
+        await db_session.flush()
+        db_session.expunge_all()
+
+        parent_repository, child_repository = ParentRepository(db_session), ChildRepository(db_session)
+        with count_queries(async_engine) as queries:
+            loaded = await parent_repository.get_many_by_id([parent.uid for parent in parents])
+        assert [parent.name for parent in loaded] == [parent.name for parent in parents]
+        assert queries.count == 1
+
+        # Loaders of different repositories and presets share the session without overlapping.
+        detailed, loaded_children = await asyncio.gather(
+            parent_repository.get_many_by_id([parent.uid for parent in parents], preset="detail"),
+            child_repository.get_many_by_id([child.uid for child in children]),
+        )
+        assert [parent.children[0].name for parent in detailed] == [child.name for child in children]
+        assert [child.parent_uid for child in loaded_children] == [parent.uid for parent in parents]
+    finally:
+        await db_session.rollback()
+        async with async_engine.begin() as connection:
+            await connection.run_sync(
+                SQLModel.metadata.drop_all, tables=[RepoTestChild.__table__, RepoTestParent.__table__]
+            )
+
+
+@pytest.fixture
+async def sqlite_engine():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(
+            SQLModel.metadata.create_all, tables=[RepoTestParent.__table__, RepoTestChild.__table__]
+        )
+    yield engine
+    await engine.dispose()
+
+
+async def _queries_for_rows(engine, rows: int) -> tuple[int, int]:
+    """Queries run by filter() and by list(), with the "detail" preset, over `rows` parents of 3 children each."""
+    async with AsyncSession(engine) as session:
+        for i in range(rows):
+            parent = RepoTestParent(name=f"parent {rows}-{i}")
+            session.add(parent)
+            session.add_all(RepoTestChild(name=f"child {j}", parent_uid=parent.uid) for j in range(3))
+        await session.commit()
+        session.expunge_all()
+
+        repository = ParentRepository(session)
+        with count_queries(engine) as filter_queries:
+            page = await repository.filter(
+                BaseFilterModel(q=f"parent {rows}-", limit=100), preset="detail", order_by=[RepoTestParent.uid]
+            )
+            assert len(page.items) == page.total == rows
+            assert all(len(parent.children) == 3 for parent in page.items)
+
+        with count_queries(engine) as list_queries:
+            parents = await repository.list(RepoTestParent.name.startswith(f"parent {rows}-"), preset="detail")
+            assert sum(len(parent.children) for parent in parents) == 3 * rows
+
+    return filter_queries.count, list_queries.count
+
+
+async def test_filter_and_list_run_a_fixed_number_of_queries(sqlite_engine):
+    one = await _queries_for_rows(sqlite_engine, 1)
+    many = await _queries_for_rows(sqlite_engine, 40)
+    # A count, a page and one selectinload for the children; the list skips the count.
+    assert one == many == (3, 2)
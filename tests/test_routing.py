@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import literal, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette_context import context, request_cycle_context
+
+from app.core.config import Config
+from app.database import routing
+from app.database.redis import redis_client
+from app.database.routing import ReplicaSet, RoutingAsyncSession
+
+REPLICA_URLS = ["postgresql+asyncpg://app@replica-a/app", "postgresql+asyncpg://app@replica-b/app"]
+
+
+def test_least_busy_picks_the_replica_with_fewest_connections():
+    replicas = ReplicaSet(REPLICA_URLS, strategy="least_busy")
+    assert {replicas.pick().url.host for _ in range(3)} == {"replica-a"}
+
+
+def test_least_busy_rotates_on_null_pool(monkeypatch):
+    monkeypatch.setattr(Config, "DB_POOL_CLASS", "null")
+    replicas = ReplicaSet(REPLICA_URLS, strategy="least_busy")
+    assert [replicas.pick().url.host for _ in range(3)] == ["replica-a", "replica-b", "replica-a"]
+
+
+@pytest.fixture
+def with_replicas(monkeypatch):
+    monkeypatch.setattr(routing, "replicas", ReplicaSet(REPLICA_URLS))
+
+
+@pytest.mark.anyio
+async def test_pin_is_only_looked_up_for_read_sessions(with_replicas, fake_redis):
+    await redis_client.pin_primary("u1", 60)
+
+    with request_cycle_context():
+        routing.route_reads_for("u1")
+        assert "db_read_primary" not in context
+
+        await routing.check_primary_pin()
+        assert context["db_read_primary"] is True
+
+
+@pytest.mark.anyio
+async def test_wrote_is_reset_after_commit():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    try:
+        async with RoutingAsyncSession(bind=engine) as session:
+            await session.exec(text("CREATE TABLE item (id INTEGER)"))
+            assert session.sync_session.wrote
+            await session.commit()
+            assert not session.sync_session.wrote
+
+            await session.exec(select(literal(1)))
+            assert not session.sync_session.wrote
+    finally:
+        await engine.dispose()
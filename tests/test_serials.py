@@ -0,0 +1,32 @@
+import asyncio
+
+import pytest
+
+from app.core.serials import SerialAllocator, reserve_from_redis
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_allocators_never_share_a_number(fake_redis):
+    async def slow_reserve(prefix, year, count):
+        # Yield around the round trip so workers run out of blocks while others are refilling.
+        await asyncio.sleep(0)
+        reserved = await reserve_from_redis(prefix, year, count)
+        await asyncio.sleep(0)
+        return reserved
+
+    # One allocator per worker process, each with several concurrent callers.
+    allocators = [SerialAllocator(block_size=7, reserve=slow_reserve) for _ in range(3)]
+    issued = []
+
+    async def caller(allocator):
+        for _ in range(25):
+            issued.append(await allocator.next_number("INV", 2026))
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*(caller(allocator) for allocator in allocators for _ in range(4)))
+
+    assert len(issued) == 3 * 4 * 25
+    assert len(set(issued)) == len(issued)
+    # Each allocator leaves at most one partly used block behind.
+    assert max(issued) <= len(issued) + 3 * 7
@@ -0,0 +1,43 @@
+import time
+
+from app.core.token_cache import TokenCache
+
+
+def test_entry_expires_at_the_token_exp_before_the_ttl(monkeypatch):
+    now = 1_000_000.0
+    monkeypatch.setattr(time, "time", lambda: now)
+    cache = TokenCache(maxsize=10, ttl=60)
+    cache.set("short", {"jti": "a", "exp": now + 5})
+    cache.set("long", {"jti": "b", "exp": now + 3600})
+
+    now += 10
+    assert cache.get("short") is None
+    assert cache.get("long") == {"jti": "b", "exp": 1_000_000.0 + 3600}
+
+    now += 60
+    assert cache.get("long") is None
+    assert len(cache) == 0
+
+
+def test_evict_jti_drops_only_that_token():
+    cache = TokenCache(maxsize=10, ttl=60)
+    cache.set("token-a", {"jti": "a"})
+    cache.set("token-b", {"jti": "b"})
+
+    cache.evict_jti("a")
+    cache.evict_jti("unknown")
+
+    assert cache.get("token-a") is None
+    assert cache.get("token-b") == {"jti": "b"}
+
+
+def test_nested_claims_are_not_shared_with_the_cache():
+    cache = TokenCache(maxsize=10, ttl=60)
+    payload = {"jti": "a", "user": {"uid": "1"}}
+    cache.set("token", payload)
+    payload["user"]["uid"] = "changed"
+
+    hit = cache.get("token")
+    hit["user"]["uid"] = "changed again"
+
+    assert cache.get("token")["user"] == {"uid": "1"}